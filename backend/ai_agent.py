@@ -1,20 +1,39 @@
 import asyncio
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
-import aiohttp
+import httpx
 import ssl
 import faiss
 import json
+import orjson
 import time
 import logging
 import os
 from dataclasses import dataclass
+from collections import deque
 import re
+import random
+from itertools import islice
 from prometheus_client import Counter, Histogram, Gauge
-from circuitbreaker import circuit
+from circuitbreaker import CircuitBreaker, CircuitBreakerError
 import hashlib
+from cachetools import LRUCache
 from datetime import datetime
 
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional: without it the solve cache is exact-match only
+    SentenceTransformer = None
+
+EMBEDDING_DIM = 384
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+ANN_SWITCH_THRESHOLD = 10000  # Entries before the flat index is rebuilt as HNSW
+
+# Review response fallbacks, used only when the reply is not parseable JSON
+_SCORE_RE = re.compile(r'"score":\s*(\d+\.?\d*)')
+_FLAW_RE = re.compile(r'"flaw":\s*"([^"]*)"')
+_IMPROVED_RE = re.compile(r'"improved":\s*"([^"]*)"', re.DOTALL)
+
 # ==============================
 # SECURITY & CONFIGURATION
 # ==============================
@@ -40,6 +59,9 @@ class ModelConfig:
     temperature_range: Tuple[float, float] = (0.7, 1.3)
     timeout: int = 30
     max_retries: int = 3
+    response_cache_size: int = 1024
+    # Fixed low temperature for peer reviews, which makes them deterministic enough to cache
+    review_temperature: float = 0.2
 
 class SecurityException(Exception):
     pass
@@ -73,10 +95,70 @@ class StructuredLogger:
         self.logger.addHandler(handler)
     
     def log_event(self, event_type: str, **kwargs):
-        self.logger.info(json.dumps({"event_type": event_type, **kwargs}))
+        self.logger.info(orjson.dumps({"event_type": event_type, **kwargs}, default=str).decode())
     
     def log_error(self, error_type: str, error_msg: str, **kwargs):
-        self.logger.error(json.dumps({"error_type": error_type, "error_msg": error_msg, **kwargs}))
+        self.logger.error(orjson.dumps({"error_type": error_type, "error_msg": error_msg, **kwargs},
+                                       default=str).decode())
+
+# ==============================
+# EMBEDDING SEARCH BATCHING
+# ==============================
+
+class _EmbeddingSearchBatcher:
+    """Coalesce concurrent k=1 index searches into a single batched search call"""
+    
+    def __init__(self, search_fn, max_batch: int = 32, max_delay: float = 0.01):
+        self._search_fn = search_fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def search(self, vec: np.ndarray) -> Tuple[float, int]:
+        """Return (score, id) of the nearest neighbour for a single (1, d) query"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((vec, future))
+        return await future
+    
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            queries = np.ascontiguousarray(np.vstack([vec for vec, _ in batch]), dtype=np.float32)
+            try:
+                scores, ids = self._search_fn(queries)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for row, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result((float(scores[row, 0]), int(ids[row, 0])))
 
 # ==============================
 # OPENROUTER AI AGENT
@@ -87,36 +169,68 @@ class SelfLearningAIAgent:
                  config: ModelConfig,
                  security_config: SecurityConfig = None,
                  num_candidates: int = 3,
-                 improvement_threshold: float = 0.15):
+                 improvement_threshold: float = 0.15,
+                 cache_similarity_threshold: float = 0.95,
+                 ann_recall_efsearch: int = 64):
         
         self.config = config
         self.security_config = security_config or SecurityConfig()
         self.num_candidates = min(num_candidates, len(config.models))
         self.improvement_threshold = improvement_threshold
+        self.cache_similarity_threshold = cache_similarity_threshold
+        self.ann_recall_efsearch = ann_recall_efsearch
         
         # Observability
         self.metrics = Metrics()
         self.logger = StructuredLogger()
         
         # Core components
-        self.knowledge_base = faiss.IndexFlatIP(384)  # Smaller dimension for demo
-        self.solution_history: List[Dict] = []
-        self.quality_milestones: List[float] = []
+        self._gpu_resources = None
+        self.knowledge_base = self._create_knowledge_base()
+        self._cache_entries: List[Dict] = []  # Parallel to knowledge_base rows
+        self._search_batcher = _EmbeddingSearchBatcher(
+            lambda queries: self.knowledge_base.search(queries, 1)
+        )
+        self._embedder = None
+        # Solve results keyed by sha256 of the task, used when no sentence embedder is installed
+        self._exact_cache = LRUCache(maxsize=config.response_cache_size)
+        self._index_rebuild: Optional[asyncio.Task] = None
+        self.solution_history: deque = deque(maxlen=1000)
+        self.quality_milestones: deque = deque(maxlen=128)
         self.best_score = 0.0
         
         # Security & Rate limiting
-        self.request_timestamps: List[float] = []
+        self.request_timestamps: deque = deque()
         self.suspicious_patterns = [
             r"(?i)(sudo|rm -rf|chmod|passwd|ssh-key)",
             r"(?i)(import os|import subprocess|__import__)",
-            r"(?i)(system|exec|eval|compile|execfile)",
+            # Call syntax only: bare words like "Evaluate" in the review rubric are fine
+            r"(?i)\b(system|exec|eval|compile|execfile)\s*\(",
             r"(?i)(\.\./|~/|/etc/|/bin/|/var/)"
         ]
+        # Single case-insensitive alternation so a prompt is scanned once, not per pattern
+        self._suspicious_re = re.compile(
+            "|".join(f"(?:{pattern[4:]})" for pattern in self.suspicious_patterns),
+            re.IGNORECASE
+        )
+        self._tag_re = re.compile(r'<[^>]+>')
+        self._newlines_re = re.compile(r'\n{10,}')
+        
+        # Fixed-temperature model responses keyed by sha256(model, max_tokens, temperature, prompt)
+        self._response_cache = LRUCache(maxsize=config.response_cache_size)
+        
+        # Shared HTTP/2 client (created lazily, closed via aclose)
+        self._client: Optional[httpx.AsyncClient] = None
+        # Built once so client (re)creation never pays for SSL context setup
+        self._ssl_ctx = ssl.create_default_context()
+        self._ssl_ctx.check_hostname = False  # Disable SSL verification for Emergent API
+        self._ssl_ctx.verify_mode = ssl.CERT_NONE
         
         # Circuit breakers
-        self.circuit_state = {}
-        for model in config.models + [config.review_model]:
-            self.circuit_state[model] = "closed"
+        self._breakers = {
+            model: CircuitBreaker(failure_threshold=5, recovery_timeout=30, name=model)
+            for model in config.models + [config.review_model]
+        }
         
         self.logger.log_event("agent_initialized", 
                             models=len(config.models),
@@ -130,21 +244,23 @@ class SelfLearningAIAgent:
         if len(prompt) > self.security_config.max_prompt_length:
             raise PromptInjectionException(f"Prompt too long: {len(prompt)}")
         
-        for pattern in self.suspicious_patterns:
-            if re.search(pattern, prompt):
-                raise PromptInjectionException(f"Malicious pattern detected: {pattern}")
+        match = self._suspicious_re.search(prompt)
+        if match:
+            raise PromptInjectionException(f"Malicious pattern detected: {match.group()}")
         
         return True
     
     def _sanitize_prompt(self, prompt: str) -> str:
-        sanitized = re.sub(r'<[^>]+>', '', prompt)
-        sanitized = re.sub(r'\n{10,}', '\n' * 5, sanitized)
+        sanitized = self._tag_re.sub('', prompt)
+        sanitized = self._newlines_re.sub('\n' * 5, sanitized)
         return sanitized[:self.security_config.max_prompt_length]
     
     def _check_rate_limit(self):
         now = time.time()
-        self.request_timestamps = [ts for ts in self.request_timestamps 
-                                 if now - ts < self.security_config.rate_limit_window]
+        # Timestamps are appended in order, so expired entries are always at the left
+        while (self.request_timestamps and
+               now - self.request_timestamps[0] >= self.security_config.rate_limit_window):
+            self.request_timestamps.popleft()
         
         if len(self.request_timestamps) >= self.security_config.rate_limit_requests:
             raise SecurityException("Rate limit exceeded")
@@ -155,15 +271,55 @@ class SelfLearningAIAgent:
     # OPENROUTER API COMMUNICATION
     # ==============================
     
-    async def _call_openrouter(self, session: aiohttp.ClientSession, model: str, 
-                               prompt: str, max_tokens: int = 2048) -> Dict[str, Any]:
-        """Call Emergent Universal API with specific model"""
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client so concurrent calls multiplex over one HTTP/2 connection"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50,
+                                    keepalive_expiry=75),
+                timeout=httpx.Timeout(self.config.timeout),
+                verify=self._ssl_ctx
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client and background search worker"""
+        await self._search_batcher.close()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    async def _call_openrouter(self, client: httpx.AsyncClient, model: str, 
+                               prompt: str, max_tokens: int = 2048,
+                               temperature: Optional[float] = None) -> Dict[str, Any]:
+        """Call Emergent Universal API with specific model
+        
+        Without a fixed temperature one is sampled from temperature_range and the
+        response is not cached, since candidates are meant to vary.
+        """
         
-        self._check_rate_limit()
         self._validate_prompt(prompt)
         
         sanitized_prompt = self._sanitize_prompt(prompt)
         
+        cache_key = None
+        if temperature is None:
+            temperature = max(0.1, min(2.0, random.uniform(*self.config.temperature_range)))
+        else:
+            cache_key = hashlib.sha256(
+                f"{model}\0{max_tokens}\0{temperature}\0{sanitized_prompt}".encode()
+            ).digest()
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        breaker = self._breakers[model]
+        if breaker.opened:
+            raise CircuitBreakerError(breaker)
+        
+        self._check_rate_limit()
+        
         headers = {
             "Authorization": f"Bearer {self.config.api_key}",
             "Content-Type": "application/json",
@@ -175,39 +331,36 @@ class SelfLearningAIAgent:
                 {"role": "user", "content": sanitized_prompt}
             ],
             "max_tokens": min(max_tokens, self.security_config.max_tokens),
-            "temperature": np.clip(np.random.uniform(*self.config.temperature_range), 0.1, 2.0),
+            "temperature": temperature,
         }
         
+        body = orjson.dumps(payload)
         url = f"{self.config.base_url}/chat/completions"
         
-        for attempt in range(self.config.max_retries):
-            try:
-                async with session.post(
-                    url, 
-                    json=payload, 
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=self.config.timeout),
-                    ssl=False  # Disable SSL verification for Emergent API
-                ) as resp:
+        # A call that still fails after all retries counts as one breaker failure
+        with breaker:
+            for attempt in range(self.config.max_retries):
+                try:
+                    resp = await client.post(url, content=body, headers=headers)
                     
-                    if resp.status == 429:
+                    if resp.status_code == 429:
                         wait_time = 2 ** attempt
                         self.logger.log_event("rate_limit_encountered", 
                                             model=model, attempt=attempt, wait_time=wait_time)
                         await asyncio.sleep(wait_time)
                         continue
                     
-                    if resp.status != 200:
-                        error_text = await resp.text()
+                    if resp.status_code != 200:
+                        error_text = resp.text
                         self.logger.log_error("model_request_failed", 
-                                            f"HTTP {resp.status}: {error_text}",
+                                            f"HTTP {resp.status_code}: {error_text}",
                                             model=model, attempt=attempt)
                         if attempt == self.config.max_retries - 1:
-                            raise aiohttp.ClientError(f"HTTP {resp.status}: {error_text}")
+                            raise httpx.HTTPError(f"HTTP {resp.status_code}: {error_text}")
                         await asyncio.sleep(1 * (attempt + 1))
                         continue
                     
-                    result = await resp.json()
+                    result = orjson.loads(resp.content)
                     
                     if "choices" not in result or len(result["choices"]) == 0:
                         self.logger.log_error("invalid_model_response", 
@@ -217,114 +370,115 @@ class SelfLearningAIAgent:
                     
                     text = result["choices"][0]["message"]["content"].strip()
                     
-                    return {
+                    response = {
                         "text": text,
                         "model": model,
                         "request_id": result.get("id", "unknown")
                     }
+                    if cache_key is not None:
+                        self._response_cache[cache_key] = response
+                    return response
                     
-            except asyncio.TimeoutError:
-                self.logger.log_error("model_timeout", 
-                                    f"Timeout on attempt {attempt + 1}",
-                                    model=model, timeout=self.config.timeout)
-                if attempt == self.config.max_retries - 1:
-                    raise
-                await asyncio.sleep(1 * (attempt + 1))
-                
-            except Exception as e:
-                self.logger.log_error("model_communication_error", str(e),
-                                    model=model, attempt=attempt)
-                if attempt == self.config.max_retries - 1:
-                    raise
-                await asyncio.sleep(1 * (attempt + 1))
-        
-        return {"text": "", "model": model, "error": "All retries failed"}
+                except httpx.TimeoutException:
+                    self.logger.log_error("model_timeout", 
+                                        f"Timeout on attempt {attempt + 1}",
+                                        model=model, timeout=self.config.timeout)
+                    if attempt == self.config.max_retries - 1:
+                        raise
+                    await asyncio.sleep(1 * (attempt + 1))
+                    
+                except Exception as e:
+                    self.logger.log_error("model_communication_error", str(e),
+                                        model=model, attempt=attempt)
+                    if attempt == self.config.max_retries - 1:
+                        raise
+                    await asyncio.sleep(1 * (attempt + 1))
+            
+            # Only reachable when every attempt was rate limited; raised inside the
+            # breaker so persistent 429s count as a failure instead of resetting it
+            raise httpx.HTTPError(f"Rate limited after {self.config.max_retries} attempts")
 
     # ==============================
     # CORE LOGIC
     # ==============================
     
-    async def _generate_candidates(self, task: str) -> List[Dict]:
-        """Generate multiple candidate solutions"""
+    async def _generate_and_review(self, task: str) -> Tuple[List[Dict], List[Dict]]:
+        """Generate candidate solutions and peer review each one as soon as it arrives"""
         self.metrics.requests_total.inc()
         
-        tasks = []
         active_models = self._get_active_models()
         
         if not active_models:
             self.logger.log_error("no_active_models", "All models are unavailable")
             raise RuntimeError("No available models")
         
-        async with aiohttp.ClientSession() as session:
-            for model in np.random.permutation(active_models)[:self.num_candidates]:
-                prompt = self._build_generation_prompt(task)
-                tasks.append(self._call_openrouter(session, model, prompt))
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            valid_results = []
-            for result in results:
-                if isinstance(result, Exception):
-                    self.logger.log_error("candidate_generation_failed", str(result))
-                    continue
-                if result.get("text", "").strip():
-                    valid_results.append(result)
-            
-            self.metrics.active_models.set(len(valid_results))
-            return valid_results
-
-    async def _peer_review(self, task: str, candidates: List[Dict]) -> List[Dict]:
-        """Peer review candidates"""
-        reviews = []
+        client = await self._get_client()
+        prompt = self._build_generation_prompt(task)
+        generation_tasks = [
+            self._call_openrouter(client, model, prompt)
+            for model in random.sample(active_models, min(self.num_candidates, len(active_models)))
+        ]
         
-        async with aiohttp.ClientSession() as session:
-            review_tasks = []
-            for candidate in candidates:
-                if not candidate["text"].strip():
-                    continue
-                
-                prompt = self._build_review_prompt(task, candidate["text"])
-                review_tasks.append(
-                    self._call_openrouter(session, self.config.review_model, prompt, 1024)
-                )
+        candidates = []
+        review_tasks = []
+        for next_result in asyncio.as_completed(generation_tasks):
+            try:
+                result = await next_result
+            except Exception as e:
+                self.logger.log_error("candidate_generation_failed", str(e))
+                continue
+            if not result.get("text", "").strip():
+                continue
             
-            review_results = await asyncio.gather(*review_tasks, return_exceptions=True)
+            candidates.append(result)
+            review_prompt = self._build_review_prompt(task, result["text"])
+            review_tasks.append(asyncio.create_task(
+                self._call_openrouter(client, self.config.review_model, review_prompt, 1024,
+                                      self.config.review_temperature)
+            ))
+        
+        self.metrics.active_models.set(len(candidates))
+        
+        review_results = await asyncio.gather(*review_tasks, return_exceptions=True)
+        
+        reviews = []
+        for candidate, review_result in zip(candidates, review_results):
+            if isinstance(review_result, Exception):
+                self.logger.log_error("review_failed", str(review_result))
+                continue
             
-            for candidate, review_result in zip(candidates, review_results):
-                if isinstance(review_result, Exception):
-                    self.logger.log_error("review_failed", str(review_result))
-                    continue
+            try:
+                review_data = self._parse_review_response(review_result["text"])
+                review_data.update({
+                    "original": candidate["text"],
+                    "model": candidate["model"],
+                    "reviewer": self.config.review_model
+                })
                 
-                try:
-                    review_data = self._parse_review_response(review_result["text"])
-                    review_data.update({
-                        "original": candidate["text"],
-                        "model": candidate["model"],
-                        "reviewer": self.config.review_model
-                    })
+                if self._validate_review_scores(review_data):
+                    reviews.append(review_data)
                     
-                    if self._validate_review_scores(review_data):
-                        reviews.append(review_data)
-                        
-                except (json.JSONDecodeError, KeyError) as e:
-                    self.logger.log_error("review_parsing_failed", str(e),
-                                        response=review_result.get("text", ""))
-                    continue
+            except (json.JSONDecodeError, KeyError) as e:
+                self.logger.log_error("review_parsing_failed", str(e),
+                                    response=review_result.get("text", ""))
+                continue
         
-        return reviews
+        return candidates, reviews
 
     def _parse_review_response(self, response_text: str) -> Dict[str, Any]:
         """Parse review response"""
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
+        # Outermost braces, same span the old greedy r'\{.*\}' match found
+        start = response_text.find("{")
+        end = response_text.rfind("}")
+        if start != -1 and end > start:
             try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
+                return orjson.loads(response_text[start:end + 1])
+            except orjson.JSONDecodeError:
                 pass
         
-        score_match = re.search(r'"score":\s*(\d+\.?\d*)', response_text)
-        flaw_match = re.search(r'"flaw":\s*"([^"]*)"', response_text)
-        improved_match = re.search(r'"improved":\s*"([^"]*)"', response_text, re.DOTALL)
+        score_match = _SCORE_RE.search(response_text)
+        flaw_match = _FLAW_RE.search(response_text)
+        improved_match = _IMPROVED_RE.search(response_text)
         
         return {
             "score": float(score_match.group(1)) if score_match else 5.0,
@@ -336,6 +490,111 @@ class SelfLearningAIAgent:
         score = review_data.get("score", 0)
         return 0 <= score <= 10
 
+    # ==============================
+    # SEMANTIC CACHE
+    # ==============================
+    
+    def _create_knowledge_base(self) -> faiss.Index:
+        """FP16 brute-force inner-product index, on GPU 0 when a CUDA build of faiss sees one"""
+        # FP16 halves the bytes scanned per query; cosine error is far below the cache threshold
+        index = faiss.IndexScalarQuantizer(
+            EMBEDDING_DIM, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+        if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+            return index
+        
+        try:
+            self._gpu_resources = faiss.StandardGpuResources()
+            gpu_config = faiss.GpuIndexFlatConfig()
+            gpu_config.device = 0
+            gpu_config.useFloat16 = True
+            return faiss.GpuIndexFlatIP(self._gpu_resources, EMBEDDING_DIM, gpu_config)
+        except Exception as e:
+            self._gpu_resources = None
+            self.logger.log_error("gpu_index_unavailable", str(e))
+            return index
+    
+    def _embed_task(self, task: str) -> np.ndarray:
+        """Embed a task as an L2-normalized (1, EMBEDDING_DIM) float32 row"""
+        if self._embedder is None:
+            self._embedder = SentenceTransformer(EMBEDDING_MODEL)
+        vec = self._embedder.encode([task], convert_to_numpy=True)
+        
+        # Normalized once here so inner product == cosine at search time
+        vec = np.ascontiguousarray(vec, dtype=np.float32)
+        faiss.normalize_L2(vec)
+        return vec
+    
+    async def _cache_lookup(self, task: str, vec: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        # Bag-of-words vectors score reworded-but-different tasks above the threshold,
+        # so without a real embedder only identical tasks are served from cache
+        if vec is None:
+            return self._exact_cache.get(hashlib.sha256(task.encode()).digest())
+        if self.knowledge_base.ntotal == 0:
+            return None
+        
+        score, entry_id = await self._search_batcher.search(vec)
+        if entry_id >= 0 and score >= self.cache_similarity_threshold:
+            return self._cache_entries[entry_id]
+        return None
+    
+    def _cache_store(self, task: str, vec: Optional[np.ndarray], result: Dict[str, Any]):
+        if vec is None:
+            self._exact_cache[hashlib.sha256(task.encode()).digest()] = result
+            return
+        
+        self.knowledge_base.add(vec)
+        self._cache_entries.append(result)
+        self.metrics.knowledge_base_size.set(self.knowledge_base.ntotal)
+        
+        if self._index_rebuild is not None:
+            return
+        # Bounded like the exact tier; the oldest quarter is evicted at once so rebuilds stay rare
+        ntotal = self.knowledge_base.ntotal
+        if ntotal >= self.config.response_cache_size:
+            self._index_rebuild = asyncio.create_task(self._rebuild_index(max(1, ntotal // 4)))
+        elif (self._gpu_resources is None and ntotal >= ANN_SWITCH_THRESHOLD and
+                not isinstance(self.knowledge_base, faiss.IndexHNSW)):
+            self._index_rebuild = asyncio.create_task(self._rebuild_index(0))
+    
+    def _build_hnsw(self, vectors: np.ndarray) -> faiss.Index:
+        index = faiss.IndexHNSWSQ(
+            EMBEDDING_DIM, faiss.ScalarQuantizer.QT_fp16, 32, faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = self.ann_recall_efsearch
+        index.add(vectors)
+        return index
+    
+    def _build_index(self, vectors: np.ndarray) -> faiss.Index:
+        # Brute force on GPU stays fast enough; HNSW only helps the CPU path
+        if self._gpu_resources is None and len(vectors) >= ANN_SWITCH_THRESHOLD:
+            return self._build_hnsw(vectors)
+        index = self._create_knowledge_base()
+        index.add(vectors)
+        return index
+    
+    async def _rebuild_index(self, drop: int):
+        """Rebuild the index off the loop without its oldest drop rows, then swap it in"""
+        old = self.knowledge_base
+        count = old.ntotal
+        try:
+            index = await asyncio.to_thread(self._build_index, old.reconstruct_n(drop, count - drop))
+        except Exception as e:
+            self.logger.log_error("knowledge_base_rebuild_failed", str(e))
+            return
+        finally:
+            self._index_rebuild = None
+        
+        # Rows stored while the index was building keep their order after the kept rows
+        if old.ntotal > count:
+            index.add(old.reconstruct_n(count, old.ntotal - count))
+        self.knowledge_base = index
+        del self._cache_entries[:drop]
+        self.metrics.knowledge_base_size.set(index.ntotal)
+        self.logger.log_event("knowledge_base_rebuilt", index=type(index).__name__,
+                              entries=index.ntotal, evicted=drop)
+
     async def solve(self, task: str) -> Dict[str, Any]:
         """Main solve method"""
         start_time = time.time()
@@ -352,7 +611,20 @@ class SelfLearningAIAgent:
                     "info": "Using Emergent Universal Key for testing (GPT-4o, Claude 3.5 Sonnet, Gemini 2.0)"
                 }
             
-            candidates = await self._generate_candidates(task)
+            task_vec = None
+            if SentenceTransformer is not None:
+                task_vec = await asyncio.to_thread(self._embed_task, task)
+            cached = await self._cache_lookup(task, task_vec)
+            if cached is not None:
+                cache_tier = "exact_hit" if task_vec is None else "semantic_hit"
+                self.logger.log_event("solve_cache_hit", tier=cache_tier, task=task[:100])
+                return {
+                    **cached,
+                    "processing_time": time.time() - start_time,
+                    "cache": cache_tier
+                }
+            
+            candidates, reviews = await self._generate_and_review(task)
             
             if not candidates:
                 return {
@@ -363,8 +635,6 @@ class SelfLearningAIAgent:
                     "confidence": "none"
                 }
             
-            reviews = await self._peer_review(task, candidates)
-            
             if not reviews:
                 best_candidate = max(candidates, key=lambda x: len(x.get("text", "")))
                 return {
@@ -389,7 +659,7 @@ class SelfLearningAIAgent:
                                 score=current_score,
                                 num_candidates=len(candidates))
             
-            return {
+            result = {
                 "solution": winner.get("improved", winner.get("original", "")),
                 "score": current_score,
                 "model": winner.get("model", "unknown"),
@@ -397,6 +667,9 @@ class SelfLearningAIAgent:
                 "flaw_corrected": winner.get("flaw", "NONE"),
                 "confidence": "high" if current_score > 7.0 else "medium"
             }
+            self._cache_store(task, task_vec, result)
+            
+            return result
             
         except Exception as e:
             self.metrics.errors_total.labels(type=e.__class__.__name__).inc()
@@ -413,18 +686,17 @@ class SelfLearningAIAgent:
     def _should_trigger_improvement(self, current_score: float) -> bool:
         if not self.quality_milestones:
             return True
-        best_previous = max(self.quality_milestones[-10:])
+        best_previous = max(islice(reversed(self.quality_milestones), 10))
         improvement = (current_score - best_previous) / (best_previous + 1e-5)
         return (improvement > self.improvement_threshold and current_score > 5.0)
 
     def _get_active_models(self) -> List[str]:
         return [model for model in self.config.models 
-                if self.circuit_state.get(model, "closed") == "closed"]
-
-    def _build_generation_prompt(self, task: str) -> str:
-        return f"""You are a specialist AI competing to provide the BEST solution. Solve rigorously:
+                if not self._breakers[model].opened]
 
-{task}
+    # Fixed prompt text around the task/solution slots, joined without re-formatting
+    _GEN_PREFIX = "You are a specialist AI competing to provide the BEST solution. Solve rigorously:\n\n"
+    _GEN_SUFFIX = """
 
 Requirements:
 - Provide factual, accurate information
@@ -434,12 +706,9 @@ Requirements:
 - Include actionable implementation details
 
 Your solution will be peer-reviewed against other AIs. The best solution wins."""
-
-    def _build_review_prompt(self, task: str, solution: str) -> str:
-        return f"""TASK: {task}
-
-CANDIDATE SOLUTION:
-{solution}
+    _REV_PREFIX = "TASK: "
+    _REV_MIDDLE = "\n\nCANDIDATE SOLUTION:\n"
+    _REV_SUFFIX = """
 
 Apply THIS scoring rubric rigorously:
 
@@ -454,11 +723,17 @@ CRITICAL FLAW: Identify ONE major flaw or "NONE" if perfect.
 IMPROVED SOLUTION: Rewrite addressing the flaw.
 
 Respond ONLY with valid JSON:
-{{
+{
   "score": X.X,
   "flaw": "specific flaw or NONE",
   "improved": "complete improved solution"
-}}"""
+}"""
+
+    def _build_generation_prompt(self, task: str) -> str:
+        return "".join((self._GEN_PREFIX, task, self._GEN_SUFFIX))
+
+    def _build_review_prompt(self, task: str, solution: str) -> str:
+        return "".join((self._REV_PREFIX, task, self._REV_MIDDLE, solution, self._REV_SUFFIX))
 
 # Factory function
 def create_ai_agent():
@@ -495,5 +770,7 @@ def create_ai_agent():
         config=config,
         security_config=security_config,
         num_candidates=int(os.getenv("AI_NUM_CANDIDATES", "3")),
-        improvement_threshold=float(os.getenv("AI_IMPROVEMENT_THRESHOLD", "0.15"))
+        improvement_threshold=float(os.getenv("AI_IMPROVEMENT_THRESHOLD", "0.15")),
+        cache_similarity_threshold=float(os.getenv("AI_CACHE_SIMILARITY_THRESHOLD", "0.95")),
+        ann_recall_efsearch=int(os.getenv("AI_ANN_EFSEARCH", "64"))
     )
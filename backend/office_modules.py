@@ -7,15 +7,152 @@ import os
 import io
 import json
 import base64
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timezone
 import asyncio
-import aiohttp
+import time
+import httpx
+import numpy as np
 from pathlib import Path
-import PyPDF2
-import docx
+from cachetools import LRUCache, TTLCache
 from PIL import Image
 import pytesseract
+import tiktoken
+import text_extraction
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional: without it cached_solve is exact-match only
+    SentenceTransformer = None
+
+ANALYSIS_TOKEN_LIMIT = 750  # Document content budget per analysis prompt
+_encoding = None
+_encoding_loaded = False
+
+def _get_encoding():
+    """Load the tokenizer once, or None if it failed; blocking, as it may fetch BPE ranks on a cold cache"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None  # Remembered so later analyses don't retry the download
+        _encoding_loaded = True
+    return _encoding
+
+# How long a cached AI result is reused before the prompt is sent again
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "3600"))
+
+# Exact-match cache of AI results, keyed by sha256 of agent type and prompt
+_ai_cache = TTLCache(maxsize=int(os.getenv("AI_CACHE_SIZE", "1024")), ttl=AI_CACHE_TTL)
+
+SEMANTIC_EMBEDDING_DIM = 384
+SEMANTIC_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+class SemanticCache:
+    """Near-duplicate AI result cache over embeddings of a prompt's free-text slot"""
+    
+    def __init__(self, threshold: float = 0.95, max_scopes: int = 64, entries_per_scope: int = 256,
+                 ttl: float = 3600):
+        self.threshold = threshold
+        self.entries_per_scope = entries_per_scope
+        self.ttl = ttl
+        # scope -> [embedding matrix, results, entries written, monotonic store times]
+        self._scopes = LRUCache(maxsize=max_scopes)
+        self._embedder = None
+    
+    @property
+    def enabled(self) -> bool:
+        # Bag-of-words vectors ignore word order ("B2B to B2C" == "B2C to B2B"),
+        # so near-duplicate matching is only safe with a real sentence embedder
+        return SentenceTransformer is not None
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Embed text as an L2-normalized float32 vector"""
+        if self._embedder is None:
+            self._embedder = SentenceTransformer(SEMANTIC_EMBEDDING_MODEL)
+        vec = self._embedder.encode(text, convert_to_numpy=True).astype(np.float32)
+        
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+    
+    def lookup(self, scope: str, vec: np.ndarray) -> Optional[Dict[str, Any]]:
+        entry = self._scopes.get(scope)
+        if entry is None:
+            return None
+        
+        matrix, results, written, stored_at = entry
+        count = min(written, self.entries_per_scope)
+        sims = matrix[:count] @ vec
+        sims[time.monotonic() - stored_at[:count] > self.ttl] = -np.inf
+        best = int(np.argmax(sims))
+        return results[best] if sims[best] >= self.threshold else None
+    
+    def store(self, scope: str, vec: np.ndarray, result: Dict[str, Any]):
+        entry = self._scopes.get(scope)
+        if entry is None:
+            entry = [
+                np.zeros((self.entries_per_scope, vec.shape[0]), dtype=np.float32),
+                [None] * self.entries_per_scope,
+                0,
+                np.zeros(self.entries_per_scope, dtype=np.float64)
+            ]
+            self._scopes[scope] = entry
+        
+        # Ring buffer: overwrite the oldest entry once the scope is full
+        slot = entry[2] % self.entries_per_scope
+        entry[0][slot] = vec
+        entry[1][slot] = result
+        entry[2] += 1
+        entry[3][slot] = time.monotonic()
+
+# Shared company block; prompts open with it and end with their variable
+# slots so providers with prompt-prefix caching can reuse the static prefix
+_NEXTAI_CONTEXT = """NextAI Global focuses on:
+- AI Estate and Trust Planning
+- Publishing
+- Software and AI Development
+- IT Services"""
+
+_semantic_cache = SemanticCache(threshold=float(os.getenv("AI_SEMANTIC_THRESHOLD", "0.95")), ttl=AI_CACHE_TTL)
+
+async def cached_solve(ai_agent, prompt: str, scope: Optional[str] = None, slot: Optional[str] = None,
+                       force_refresh: bool = False) -> Dict[str, Any]:
+    """Solve a prompt, reusing the result for identical prompts
+    
+    With a scope and a sentence embedder installed, a prompt whose free-text
+    slot is a near duplicate of an earlier one in the same scope also reuses
+    that result. The scope must carry every templated value that changes the
+    answer (duration, platform). force_refresh skips both lookups and replaces
+    the cached result.
+    """
+    key = hashlib.sha256(f"{type(ai_agent).__name__}\0{prompt}".encode()).hexdigest()
+    if not force_refresh:
+        result = _ai_cache.get(key)
+        if result is not None:
+            return result
+    
+    vec = None
+    if scope is not None and _semantic_cache.enabled:
+        scope = f"{type(ai_agent).__name__}\0{scope}"
+        vec = await asyncio.to_thread(_semantic_cache.embed, slot or "")
+        if not force_refresh:
+            result = _semantic_cache.lookup(scope, vec)
+            if result is not None:
+                _ai_cache[key] = result
+                return result
+    
+    result = await ai_agent.solve(prompt)
+    # Don't pin error or unconfigured responses
+    if result.get("confidence") != "none":
+        _ai_cache[key] = result
+        if vec is not None:
+            _semantic_cache.store(scope, vec, result)
+    return result
 
 # ==============================
 # DOCUMENT PROCESSING MODULE
@@ -28,24 +165,56 @@ class DocumentProcessor:
         self.upload_folder = Path(os.getenv("UPLOAD_FOLDER", "/app/backend/uploads"))
         self.upload_folder.mkdir(exist_ok=True)
         self.max_file_size = int(os.getenv("MAX_FILE_SIZE_MB", "50")) * 1024 * 1024
+        self.ocr_max_dimension = int(os.getenv("OCR_MAX_DIMENSION", "2000"))
+        # Extracted text keyed by (sha256 of file bytes, extension)
+        self._doc_cache = LRUCache(maxsize=int(os.getenv("DOC_CACHE_SIZE", "256")))
+        # PDF/DOCX parsing is pure Python and holds the GIL, so larger files are parsed
+        # in worker processes; below the cutoff process round-trip latency isn't worth it
+        self.process_extract_min_bytes = int(os.getenv("EXTRACT_PROCESS_MIN_KB", "256")) * 1024
+        # Each spawned worker costs an interpreter plus the parser imports, so keep the default small
+        self.extract_workers = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self._extract_pool = self._new_extract_pool()
+    
+    def _new_extract_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.extract_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    
+    def close(self):
+        """Stop the extraction worker processes"""
+        self._extract_pool.shutdown(wait=False, cancel_futures=True)
         
-    async def process_document(self, file_path: str, filename: str) -> Dict[str, Any]:
+    async def process_document(self, file_path: str, filename: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
         """Process uploaded document and extract content"""
         try:
             file_ext = Path(filename).suffix.lower()
+            if content_hash is None:
+                content_hash = await asyncio.to_thread(self._hash_file, file_path)
+            cache_key = (content_hash, file_ext)
+            extracted = self._doc_cache.get(cache_key)
             
-            # Extract text based on file type
-            if file_ext == '.pdf':
-                text = await self.extract_pdf_text(file_path)
-            elif file_ext in ['.docx', '.doc']:
-                text = await self.extract_docx_text(file_path)
-            elif file_ext in ['.txt']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            elif file_ext in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']:
-                text = await self.extract_image_text(file_path)
-            else:
-                return {"error": f"Unsupported file type: {file_ext}"}
+            if extracted is None:
+                # Extract text based on file type
+                if file_ext == '.pdf':
+                    text = await self.extract_pdf_text(file_path)
+                elif file_ext in ['.docx', '.doc']:
+                    text = await self.extract_docx_text(file_path)
+                elif file_ext in ['.txt']:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                elif file_ext in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']:
+                    text = await self.extract_image_text(file_path)
+                else:
+                    return {"error": f"Unsupported file type: {file_ext}"}
+                
+                extracted = {
+                    "text_content": text,
+                    "word_count": len(text.split()),
+                    "char_count": len(text)
+                }
+                if not text.startswith("OCR failed:"):
+                    self._doc_cache[cache_key] = extracted
             
             # Get file metadata
             file_stats = os.stat(file_path)
@@ -54,42 +223,88 @@ class DocumentProcessor:
                 "filename": filename,
                 "file_type": file_ext,
                 "file_size": file_stats.st_size,
-                "text_content": text,
-                "word_count": len(text.split()),
-                "char_count": len(text),
-                "processed_at": datetime.now(timezone.utc).isoformat()
+                **extracted,
+                "content_hash": content_hash,
+                "processed_at": datetime.now(timezone.utc)
             }
             
         except Exception as e:
             return {"error": f"Failed to process document: {str(e)}"}
     
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        h = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
+    
+    async def _run_extractor(self, extractor, file_path: str) -> str:
+        # Workers only receive the path, so nothing large is pickled across
+        if os.path.getsize(file_path) < self.process_extract_min_bytes:
+            return await asyncio.to_thread(extractor, file_path)
+        loop = asyncio.get_running_loop()
+        pool = self._extract_pool
+        try:
+            return await loop.run_in_executor(pool, extractor, file_path)
+        except BrokenProcessPool:
+            # A worker died (OOM, crash on a malformed file) and the pool is unusable
+            # for good; replace it once, unless a concurrent caller already has
+            if self._extract_pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._extract_pool = self._new_extract_pool()
+            return await loop.run_in_executor(self._extract_pool, extractor, file_path)
+    
     async def extract_pdf_text(self, file_path: str) -> str:
         """Extract text from PDF"""
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+        return await self._run_extractor(text_extraction.extract_pdf_text, file_path)
     
     async def extract_docx_text(self, file_path: str) -> str:
         """Extract text from DOCX"""
-        doc = docx.Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
+        return await self._run_extractor(text_extraction.extract_docx_text, file_path)
     
     async def extract_image_text(self, file_path: str) -> str:
         """Extract text from image using OCR"""
         try:
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image)
-            return text.strip()
+            return await asyncio.to_thread(self._extract_image_text_sync, file_path)
         except Exception as e:
             return f"OCR failed: {str(e)}"
     
+    def _extract_image_text_sync(self, file_path: str) -> str:
+        # Tesseract cost scales with pixel count, so grayscale and cap the size first
+        with Image.open(file_path) as image:
+            image = image.convert('L')
+            if max(image.size) > self.ocr_max_dimension:
+                image.thumbnail((self.ocr_max_dimension, self.ocr_max_dimension),
+                                Image.Resampling.LANCZOS)
+            return pytesseract.image_to_string(image).strip()
+    
+    def _truncate_for_analysis(self, text: str, encoding) -> str:
+        # Every token covers at least one UTF-8 byte, so short text needs no tokenizing
+        if len(text.encode('utf-8')) <= ANALYSIS_TOKEN_LIMIT:
+            return text
+        if encoding is None:
+            return text[:ANALYSIS_TOKEN_LIMIT * 4]
+        # Only tokenize a generous prefix rather than the whole document; runs like
+        # dot leaders compress to few tokens, so even an in-budget prefix is the cap
+        prefix = text[:ANALYSIS_TOKEN_LIMIT * 8]
+        tokens = encoding.encode(prefix, disallowed_special=())
+        if len(tokens) <= ANALYSIS_TOKEN_LIMIT:
+            return prefix
+        return encoding.decode(tokens[:ANALYSIS_TOKEN_LIMIT])
+    
     async def analyze_with_ai(self, document_data: Dict, ai_agent) -> Dict[str, Any]:
         """Analyze document content with AI agent"""
-        prompt = f"""Analyze this document and provide a comprehensive summary:
+        encoding = _encoding if _encoding_loaded else await asyncio.to_thread(_get_encoding)
+        content = self._truncate_for_analysis(document_data['text_content'], encoding)
+        prompt = f"""Analyze the document below and provide a comprehensive summary.
+
+Please provide:
+1. A concise summary
+2. Key points or action items
+3. Document category (contract, invoice, report, correspondence, etc.)
+4. Any important dates or deadlines mentioned
+5. Recommended actions
 
 Filename: {document_data['filename']}
 Type: {document_data['file_type']}
@@ -97,16 +312,10 @@ Size: {document_data['file_size']} bytes
 Word Count: {document_data['word_count']}
 
 Content:
-{document_data['text_content'][:3000]}
+{content}"""
 
-Please provide:
-1. A concise summary
-2. Key points or action items
-3. Document category (contract, invoice, report, correspondence, etc.)
-4. Any important dates or deadlines mentioned
-5. Recommended actions"""
-
-        result = await ai_agent.solve(prompt)
+        result = await cached_solve(ai_agent, prompt)
+        
         return {
             **document_data,
             "ai_analysis": result["solution"],
@@ -143,7 +352,7 @@ class CommunicationHub:
                 "to": to_number,
                 "from": self.fax_number,
                 "document": document_url,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": datetime.now(timezone.utc),
                 "message": "Fax queued successfully (Twilio integration ready)"
             }
         except Exception as e:
@@ -164,7 +373,7 @@ class CommunicationHub:
                 "to": to,
                 "subject": subject,
                 "from": self.from_email,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": datetime.now(timezone.utc),
                 "message": "Email sent successfully (SendGrid integration ready)"
             }
         except Exception as e:
@@ -172,17 +381,18 @@ class CommunicationHub:
     
     async def generate_email_reply(self, original_email: str, ai_agent) -> Dict:
         """Generate AI-powered email reply"""
-        prompt = f"""Generate a professional email reply to the following email:
-
-{original_email}
+        prompt = f"""Generate a professional email reply to the email below.
 
 Requirements:
 - Professional and courteous tone
 - Address all points raised
 - Clear and concise
-- Include appropriate greeting and closing"""
+- Include appropriate greeting and closing
+
+Email:
+{original_email}"""
 
-        result = await ai_agent.solve(prompt)
+        result = await cached_solve(ai_agent, prompt)
         return {
             "reply": result["solution"],
             "confidence": result.get("confidence", "medium"),
@@ -204,7 +414,7 @@ class MarketingAutomation:
             "instagram": os.getenv("INSTAGRAM_ACCESS_TOKEN")
         }
     
-    async def generate_social_post(self, topic: str, platform: str, ai_agent) -> Dict:
+    async def generate_social_post(self, topic: str, platform: str, ai_agent, force_refresh: bool = False) -> Dict:
         """Generate social media post with AI"""
         
         platform_guidelines = {
@@ -216,26 +426,23 @@ class MarketingAutomation:
         
         guideline = platform_guidelines.get(platform, "Professional and engaging")
         
-        prompt = f"""Create a {platform} post about: {topic}
+        prompt = f"""{_NEXTAI_CONTEXT}
 
-Platform Guidelines: {guideline}
+Make the post engaging, professional, and include relevant hashtags.
 
-NextAI Global focuses on:
-- AI Estate and Trust Planning
-- Publishing
-- Software and AI Development  
-- IT Services
+Platform Guidelines: {guideline}
 
-Make it engaging, professional, and include relevant hashtags."""
+Create a {platform} post about: {topic}"""
 
-        result = await ai_agent.solve(prompt)
+        result = await cached_solve(ai_agent, prompt, scope=f"social_post:{platform}", slot=topic,
+                                    force_refresh=force_refresh)
         
         return {
             "platform": platform,
             "content": result["solution"],
             "topic": topic,
             "confidence": result.get("confidence"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     
     async def post_to_social(self, platform: str, content: str) -> Dict:
@@ -254,21 +461,15 @@ Make it engaging, professional, and include relevant hashtags."""
             "status": "posted",
             "platform": platform,
             "content_preview": content[:100],
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "message": f"Post queued for {platform} (API integration ready)"
         }
     
-    async def generate_marketing_campaign(self, campaign_type: str, ai_agent) -> Dict:
+    async def generate_marketing_campaign(self, campaign_type: str, ai_agent, force_refresh: bool = False) -> Dict:
         """Generate complete marketing campaign"""
-        prompt = f"""Create a complete marketing campaign for NextAI Global:
+        prompt = f"""{_NEXTAI_CONTEXT}
 
-Campaign Type: {campaign_type}
-
-Company Focus:
-- AI Estate and Trust Planning
-- Publishing Services
-- Software and AI Development
-- IT Solutions
+Create a complete marketing campaign for NextAI Global.
 
 Include:
 1. Campaign theme and messaging
@@ -276,15 +477,18 @@ Include:
 3. Key value propositions
 4. Content ideas for each platform (LinkedIn, Twitter, Facebook, Instagram)
 5. Suggested timeline
-6. Call-to-action strategies"""
+6. Call-to-action strategies
+
+Campaign Type: {campaign_type}"""
 
-        result = await ai_agent.solve(prompt)
+        result = await cached_solve(ai_agent, prompt, scope="campaign", slot=campaign_type,
+                                    force_refresh=force_refresh)
         
         return {
             "campaign_type": campaign_type,
             "strategy": result["solution"],
             "confidence": result.get("confidence"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
 
 # ==============================
@@ -298,17 +502,11 @@ class VideoGenerator:
         self.synthesia_key = os.getenv("SYNTHESIA_API_KEY")
         self.elevenlabs_key = os.getenv("ELEVENLABS_API_KEY")
     
-    async def generate_commercial_script(self, duration: int, focus: str, ai_agent) -> Dict:
+    async def generate_commercial_script(self, duration: int, focus: str, ai_agent, force_refresh: bool = False) -> Dict:
         """Generate commercial script with AI"""
-        prompt = f"""Create a {duration}-second commercial script for NextAI Global:
+        prompt = f"""{_NEXTAI_CONTEXT}
 
-Focus: {focus}
-
-Company Services:
-- AI Estate and Trust Planning
-- Publishing
-- Software and AI Development
-- IT Services
+Create a commercial script for NextAI Global.
 
 Requirements:
 - Engaging hook in first 3 seconds
@@ -316,16 +514,19 @@ Requirements:
 - Professional tone
 - Strong call-to-action
 - Include scene descriptions and dialogue
-- Format for {duration} seconds"""
 
-        result = await ai_agent.solve(prompt)
+Duration: {duration} seconds
+Focus: {focus}"""
+
+        result = await cached_solve(ai_agent, prompt, scope=f"commercial:{duration}", slot=focus,
+                                    force_refresh=force_refresh)
         
         return {
             "duration": duration,
             "focus": focus,
             "script": result["solution"],
             "confidence": result.get("confidence"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     
     async def generate_video(self, script: str, voice_type: str = "professional") -> Dict:
@@ -342,7 +543,7 @@ Requirements:
             "script_preview": script[:100],
             "voice_type": voice_type,
             "message": "Video generation queued (Synthesia integration ready)",
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": datetime.now(timezone.utc)
         }
 
 # ==============================
@@ -352,84 +553,86 @@ Requirements:
 class WebsiteManager:
     """Monitor and maintain website"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.website_url = os.getenv("WEBSITE_URL", "https://nextaiglobal.com")
         self.uptime_key = os.getenv("UPTIME_ROBOT_API_KEY")
+        self.client = client  # Shared pooled HTTP/2 client, owned by the caller
     
     async def check_website_status(self) -> Dict:
         """Check website uptime and performance"""
         try:
-            async with aiohttp.ClientSession() as session:
-                start_time = asyncio.get_event_loop().time()
-                async with session.get(self.website_url, timeout=10) as response:
-                    end_time = asyncio.get_event_loop().time()
-                    response_time = (end_time - start_time) * 1000
-                    
-                    return {
-                        "url": self.website_url,
-                        "status": "online",
-                        "status_code": response.status,
-                        "response_time_ms": round(response_time, 2),
-                        "checked_at": datetime.now(timezone.utc).isoformat()
-                    }
+            if self.client is None:
+                async with httpx.AsyncClient(follow_redirects=True) as client:
+                    return await self._fetch_status(client)
+            return await self._fetch_status(self.client)
         except Exception as e:
             return {
                 "url": self.website_url,
                 "status": "error",
                 "error": str(e),
-                "checked_at": datetime.now(timezone.utc).isoformat()
+                "checked_at": datetime.now(timezone.utc)
             }
     
-    async def analyze_seo(self, ai_agent) -> Dict:
+    async def _fetch_status(self, client: httpx.AsyncClient) -> Dict:
+        start_time = time.perf_counter()
+        response = await client.get(self.website_url, timeout=10)
+        response_time = (time.perf_counter() - start_time) * 1000
+        
+        return {
+            "url": self.website_url,
+            "status": "online",
+            "status_code": response.status_code,
+            "response_time_ms": round(response_time, 2),
+            "checked_at": datetime.now(timezone.utc)
+        }
+    
+    async def analyze_seo(self, ai_agent, force_refresh: bool = False) -> Dict:
         """Analyze website SEO with AI"""
-        prompt = f"""Analyze the SEO and provide recommendations for: {self.website_url}
+        prompt = f"""{_NEXTAI_CONTEXT}
 
-Focus on NextAI Global's services:
-- AI Estate and Trust Planning
-- Publishing
-- Software and AI Development
-- IT Services
+Analyze the SEO of NextAI Global's website with a focus on these services.
 
 Provide recommendations for:
 1. Keyword optimization
 2. Content strategy
 3. Technical SEO improvements
 4. Meta descriptions and titles
-5. Link building strategies"""
+5. Link building strategies
+
+Website: {self.website_url}"""
 
-        result = await ai_agent.solve(prompt)
+        result = await cached_solve(ai_agent, prompt, force_refresh=force_refresh)
         
         return {
             "website": self.website_url,
             "analysis": result["solution"],
             "confidence": result.get("confidence"),
-            "analyzed_at": datetime.now(timezone.utc).isoformat()
+            "analyzed_at": datetime.now(timezone.utc)
         }
     
-    async def generate_website_content(self, page: str, ai_agent) -> Dict:
+    async def generate_website_content(self, page: str, ai_agent, force_refresh: bool = False) -> Dict:
         """Generate website content with AI"""
-        prompt = f"""Generate professional website content for NextAI Global's {page} page:
+        prompt = f"""{_NEXTAI_CONTEXT}
 
-Company Focus:
-- AI Estate and Trust Planning
-- Publishing Services
-- Software and AI Development
-- IT Solutions
+Generate professional website content for a NextAI Global page.
 
 Requirements:
 - Professional and engaging
 - SEO-optimized
 - Clear call-to-action
 - Highlight unique value propositions
-- Include relevant keywords naturally"""
+- Include relevant keywords naturally
 
-        result = await ai_agent.solve(prompt)
+Page: {page}"""
+
+        result = await cached_solve(ai_agent, prompt, scope="website_content", slot=page,
+                                    force_refresh=force_refresh)
         
         return {
             "page": page,
             "content": result["solution"],
             "confidence": result.get("confidence"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
 
 # ==============================
@@ -439,18 +642,22 @@ Requirements:
 class TaskCoordinator:
     """Coordinate all office management tasks"""
     
-    def __init__(self, ai_agent):
+    # Task types whose handlers take the AI agent
+    _needs_ai = frozenset({
+        "analyze_document", "generate_email_reply", "generate_social_post",
+        "generate_campaign", "generate_commercial", "analyze_seo", "generate_web_content"
+    })
+    
+    def __init__(self, ai_agent, http_client: Optional[httpx.AsyncClient] = None):
         self.ai_agent = ai_agent
         self.document_processor = DocumentProcessor()
         self.communication = CommunicationHub()
         self.marketing = MarketingAutomation()
         self.video_gen = VideoGenerator()
-        self.website = WebsiteManager()
-    
-    async def execute_task(self, task_type: str, task_data: Dict) -> Dict:
-        """Execute any office management task dynamically"""
+        self.website = WebsiteManager(http_client)
         
-        tasks = {
+        # Dispatch table built once rather than on every execute_task call
+        self._tasks = {
             "process_document": self.document_processor.process_document,
             "analyze_document": self.document_processor.analyze_with_ai,
             "send_fax": self.communication.send_fax,
@@ -465,15 +672,16 @@ class TaskCoordinator:
             "analyze_seo": self.website.analyze_seo,
             "generate_web_content": self.website.generate_website_content
         }
-        
-        task_func = tasks.get(task_type)
+    
+    async def execute_task(self, task_type: str, task_data: Dict) -> Dict:
+        """Execute any office management task dynamically"""
+        task_func = self._tasks.get(task_type)
         if not task_func:
             return {"error": f"Unknown task type: {task_type}"}
         
         try:
             # Add AI agent to tasks that need it
-            if task_type in ["analyze_document", "generate_email_reply", "generate_social_post", 
-                           "generate_campaign", "generate_commercial", "analyze_seo", "generate_web_content"]:
+            if task_type in self._needs_ai:
                 task_data["ai_agent"] = self.ai_agent
             
             result = await task_func(**task_data)
@@ -29,69 +29,71 @@ async def seed_database():
     
     # Clear existing data
     print("Clearing existing data...")
-    await db.customers.delete_many({})
-    await db.sales.delete_many({})
-    await db.refunds.delete_many({})
-    await db.issues.delete_many({})
-    await db.activities.delete_many({})
+    await asyncio.gather(
+        db.customers.delete_many({}),
+        db.sales.delete_many({}),
+        db.refunds.delete_many({}),
+        db.issues.delete_many({}),
+        db.activities.delete_many({})
+    )
+    
+    # One reference time for every seeded timestamp
+    now = datetime.now(timezone.utc)
     
     # Sample customers
     customers = [
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "name": "John Smith",
             "email": "john.smith@example.com",
             "phone": "+1-555-0101",
             "company": "Acme Corp",
             "status": "active",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=45)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=45)).isoformat()
+            "created_at": now - timedelta(days=45),
+            "updated_at": now - timedelta(days=45)
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "name": "Sarah Johnson",
             "email": "sarah.j@example.com",
             "phone": "+1-555-0102",
             "company": "TechStart Inc",
             "status": "active",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=30)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+            "created_at": now - timedelta(days=30),
+            "updated_at": now - timedelta(days=30)
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "name": "Michael Brown",
             "email": "mbrown@example.com",
             "phone": "+1-555-0103",
             "company": "Global Services",
             "status": "active",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=20)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=20)).isoformat()
+            "created_at": now - timedelta(days=20),
+            "updated_at": now - timedelta(days=20)
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "name": "Emily Davis",
             "email": "emily.davis@example.com",
             "phone": "+1-555-0104",
             "company": "Design Studio",
             "status": "active",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=15)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=15)).isoformat()
+            "created_at": now - timedelta(days=15),
+            "updated_at": now - timedelta(days=15)
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "name": "Robert Wilson",
             "email": "rwilson@example.com",
             "phone": "+1-555-0105",
             "company": "Enterprise Solutions",
             "status": "active",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=5)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=5)).isoformat()
+            "created_at": now - timedelta(days=5),
+            "updated_at": now - timedelta(days=5)
         }
     ]
     
-    print(f"Creating {len(customers)} customers...")
-    await db.customers.insert_many(customers)
-    
     # Sample sales
     products = [
         "AI Estate Planning Consultation",
@@ -104,138 +106,114 @@ async def seed_database():
         "Business Process Automation"
     ]
     
-    sales = []
-    for i in range(20):
-        customer = random.choice(customers)
-        sales.append({
-            "id": str(uuid.uuid4()),
+    sales = [
+        {
+            "id": uuid.uuid4().hex,
             "customer_id": customer["id"],
             "customer_name": customer["name"],
             "product": random.choice(products),
             "amount": round(random.uniform(50, 1500), 2),
             "status": "completed",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=random.randint(1, 30))).isoformat()
-        })
-    
-    print(f"Creating {len(sales)} sales...")
-    await db.sales.insert_many(sales)
+            "created_at": now - timedelta(days=random.randint(1, 30))
+        }
+        for customer in random.choices(customers, k=20)
+    ]
     
     # Sample refunds
-    refunds = []
-    for i in range(3):
-        sale = random.choice(sales[:5])
-        refunds.append({
-            "id": str(uuid.uuid4()),
+    refund_reasons = [
+        "Service not satisfactory",
+        "Medical complication",
+        "Scheduling conflict",
+        "Insurance issue"
+    ]
+    refund_statuses = ["pending", "approved", "pending"]
+    refunds = [
+        {
+            "id": uuid.uuid4().hex,
             "sale_id": sale["id"],
             "customer_id": sale["customer_id"],
             "customer_name": sale["customer_name"],
             "amount": sale["amount"],
-            "reason": random.choice([
-                "Service not satisfactory",
-                "Medical complication",
-                "Scheduling conflict",
-                "Insurance issue"
-            ]),
-            "status": random.choice(["pending", "approved", "pending"]),
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=random.randint(1, 10))).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=random.randint(1, 10))).isoformat()
-        })
-    
-    print(f"Creating {len(refunds)} refunds...")
-    await db.refunds.insert_many(refunds)
+            "reason": random.choice(refund_reasons),
+            "status": random.choice(refund_statuses),
+            "created_at": now - timedelta(days=random.randint(1, 10)),
+            "updated_at": now - timedelta(days=random.randint(1, 10))
+        }
+        for sale in random.choices(sales[:5], k=3)
+    ]
     
     # Sample issues
     issues = [
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "title": "Billing discrepancy",
             "description": "Customer reported incorrect charges on invoice",
             "customer_id": customers[0]["id"],
             "customer_name": customers[0]["name"],
             "priority": "high",
             "status": "open",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=2)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+            "created_at": now - timedelta(days=2),
+            "updated_at": now - timedelta(days=2)
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "title": "Appointment rescheduling",
             "description": "Need to reschedule due to emergency",
             "customer_id": customers[1]["id"],
             "customer_name": customers[1]["name"],
             "priority": "medium",
             "status": "in_progress",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=5)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=4)).isoformat()
+            "created_at": now - timedelta(days=5),
+            "updated_at": now - timedelta(days=4)
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "title": "Insurance claim pending",
             "description": "Waiting for insurance approval",
             "customer_id": customers[2]["id"],
             "customer_name": customers[2]["name"],
             "priority": "low",
             "status": "open",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+            "created_at": now - timedelta(days=7),
+            "updated_at": now - timedelta(days=7)
         }
     ]
     
-    print(f"Creating {len(issues)} issues...")
-    await db.issues.insert_many(issues)
-    
-    # Sample activities
-    activities = []
-    
-    # Customer activities
-    for customer in customers[:3]:
-        activities.append({
-            "id": str(uuid.uuid4()),
-            "type": "customer",
-            "action": "created",
-            "description": f"New customer: {customer['name']}",
-            "entity_id": customer["id"],
-            "created_at": customer["created_at"]
-        })
-    
-    # Sales activities
-    for sale in sales[:5]:
-        activities.append({
-            "id": str(uuid.uuid4()),
-            "type": "sale",
-            "action": "created",
-            "description": f"New sale: {sale['product']} for ${sale['amount']}",
-            "entity_id": sale["id"],
-            "created_at": sale["created_at"]
-        })
-    
-    # Refund activities
-    for refund in refunds:
-        activities.append({
-            "id": str(uuid.uuid4()),
-            "type": "refund",
-            "action": "created",
-            "description": f"Refund request: ${refund['amount']}",
-            "entity_id": refund["id"],
-            "created_at": refund["created_at"]
-        })
-    
-    # Issue activities
-    for issue in issues:
-        activities.append({
-            "id": str(uuid.uuid4()),
-            "type": "issue",
-            "action": "created",
-            "description": f"New issue: {issue['title']}",
-            "entity_id": issue["id"],
-            "created_at": issue["created_at"]
-        })
+    # Sample activities, one comprehension per source collection
+    activities = [
+        {"id": uuid.uuid4().hex, "type": "customer", "action": "created",
+         "description": f"New customer: {c['name']}", "entity_id": c["id"], "created_at": c["created_at"]}
+        for c in customers[:3]
+    ] + [
+        {"id": uuid.uuid4().hex, "type": "sale", "action": "created",
+         "description": f"New sale: {s['product']} for ${s['amount']}", "entity_id": s["id"], "created_at": s["created_at"]}
+        for s in sales[:5]
+    ] + [
+        {"id": uuid.uuid4().hex, "type": "refund", "action": "created",
+         "description": f"Refund request: ${r['amount']}", "entity_id": r["id"], "created_at": r["created_at"]}
+        for r in refunds
+    ] + [
+        {"id": uuid.uuid4().hex, "type": "issue", "action": "created",
+         "description": f"New issue: {i['title']}", "entity_id": i["id"], "created_at": i["created_at"]}
+        for i in issues
+    ]
     
-    # Sort by date
+    # Sort by date; created_at is a datetime, so no string compares
     activities.sort(key=lambda x: x["created_at"], reverse=True)
     
+    # Lists are built up front so the independent inserts can run concurrently
+    print(f"Creating {len(customers)} customers...")
+    print(f"Creating {len(sales)} sales...")
+    print(f"Creating {len(refunds)} refunds...")
+    print(f"Creating {len(issues)} issues...")
     print(f"Creating {len(activities)} activities...")
-    await db.activities.insert_many(activities)
+    await asyncio.gather(
+        db.customers.insert_many(customers),
+        db.sales.insert_many(sales),
+        db.refunds.insert_many(refunds),
+        db.issues.insert_many(issues),
+        db.activities.insert_many(activities)
+    )
     
     # Summary
     print("\\n✅ Database seeded successfully!")
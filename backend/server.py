@@ -1,53 +1,141 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Query
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.formparsers import MultiPartParser
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import List, Optional
-import uuid
+import time
+import hashlib
+import tempfile
 from datetime import datetime, timezone, timedelta
+from contextvars import ContextVar
 from ai_agent import create_ai_agent as create_complex_agent
 from simple_agent import create_ai_agent
 from office_modules import TaskCoordinator, DocumentProcessor, CommunicationHub, MarketingAutomation, VideoGenerator, WebsiteManager
 import asyncio
-import shutil
+import queue
+import httpx
+from cachetools import TTLCache
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)  # datetimes come back as aware UTC
 db = client[os.environ['DB_NAME']]
 
-# Initialize AI Agent
+# AI agent and task coordinator, created by the startup hook
 ai_agent = None
 task_coordinator = None
+AGENT_READY: bool = False
 
 # Create the main app
-app = FastAPI(title="OfficeFlow AI API")
+app = FastAPI(title="OfficeFlow AI API", default_response_class=ORJSONResponse)
 
 # Create router with /api prefix
 api_router = APIRouter(prefix="/api")
 
+# List endpoint paging
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# CRM lists kept their pre-paging default; the frontend still fetches them in one call
+CRM_PAGE_SIZE = 1000
+# Stable CRM page order: insertion order, with id breaking created_at ties
+CRM_SORT = [("created_at", 1), ("id", 1)]
+
+# Office list endpoints are served from a short-lived cache, cleared on writes
+listing_cache = TTLCache(maxsize=128, ttl=int(os.getenv("LISTING_CACHE_TTL", "10")))
+
+# Dashboard reporting window and the static tail of its sales pipeline
+DASHBOARD_WINDOW = timedelta(days=30)
+OPEN_ISSUE_STATUSES = ["open", "in_progress"]
+SALES_SUMMARY_FACET = {"$facet": {
+    "total": [{"$group": {"_id": None, "total": {"$sum": "$amount"}}}],
+    "by_product": [
+        {"$group": {
+            "_id": "$product",
+            "revenue": {"$sum": "$amount"},
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"revenue": -1}},
+        {"$limit": 10},
+        # Emit the response shape directly so no Python-side reshaping is needed
+        {"$project": {"_id": 0, "product": "$_id", "revenue": 1, "count": 1}}
+    ]
+}}
+
+# Health payloads; read-only, returned as-is on every poll
+_HEALTH_OK = {"status": "healthy", "database": "connected", "ai_agent": "ready"}
+_HEALTH_STARTING = {"status": "healthy", "database": "connected", "ai_agent": "not initialized"}
+
+# Allowed CORS origins, parsed once at import
+CORS_ORIGINS = [origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',')]
+
+# Uploads are copied to disk in bounded chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+UPLOAD_SENDFILE_SIZE = 64 << 20  # Per sendfile(2) call for uploads spooled to disk
+UPLOAD_BUFFER_POOL_SIZE = 16  # Most idle copy buffers kept for reuse
+
+# Activity log writes are queued and flushed in batches off the request path
+ACTIVITY_BATCH_SIZE = 100
+ACTIVITY_FLUSH_INTERVAL = 0.05  # Seconds a batch waits for concurrent writes to join it
+
+# One UTC timestamp per request, stamped by RequestTimeMiddleware
+_request_now: ContextVar[Optional[datetime]] = ContextVar("request_now", default=None)
+
+def _now() -> datetime:
+    """Current request's timestamp, or the wall clock outside a request"""
+    return _request_now.get() or datetime.now(timezone.utc)
+
+def uuid7_hex() -> str:
+    """Time-ordered UUIDv7 (RFC 9562) as 32 hex chars, so new ids append to the id indexes"""
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (time.time_ns() // 1_000_000 & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | (rand >> 68 & 0xFFF) << 64
+        | 0b10 << 62
+        | (rand & 0x3FFFFFFFFFFFFFFF)
+    )
+    return f"{value:032x}"
+
+class RequestTimeMiddleware:
+    """Stamp each HTTP request with a single UTC datetime"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_now.set(datetime.now(timezone.utc))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_now.reset(token)
+
 # ==============================
 # DATA MODELS
 # ==============================
 
 class Customer(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     name: str
     email: str
     phone: Optional[str] = None
     company: Optional[str] = None
     status: str = "active"  # active, inactive
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_now)
+    updated_at: datetime = Field(default_factory=_now)
 
 class CustomerCreate(BaseModel):
     name: str
@@ -64,13 +152,13 @@ class CustomerUpdate(BaseModel):
 
 class Sale(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     customer_id: str
     customer_name: str
     product: str
     amount: float
     status: str = "completed"  # completed, pending, cancelled
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_now)
 
 class SaleCreate(BaseModel):
     customer_id: str
@@ -81,15 +169,15 @@ class SaleCreate(BaseModel):
 
 class Refund(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     sale_id: str
     customer_id: str
     customer_name: str
     amount: float
     reason: str
     status: str = "pending"  # pending, approved, rejected, completed
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_now)
+    updated_at: datetime = Field(default_factory=_now)
 
 class RefundCreate(BaseModel):
     sale_id: str
@@ -103,15 +191,15 @@ class RefundUpdate(BaseModel):
 
 class Issue(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     title: str
     description: str
     customer_id: Optional[str] = None
     customer_name: Optional[str] = None
     priority: str = "medium"  # low, medium, high
     status: str = "open"  # open, in_progress, resolved, closed
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_now)
+    updated_at: datetime = Field(default_factory=_now)
 
 class IssueCreate(BaseModel):
     title: str
@@ -128,26 +216,26 @@ class IssueUpdate(BaseModel):
 
 class ChatMessage(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     message: str
     response: str
     score: Optional[float] = None
     model: Optional[str] = None
     confidence: Optional[str] = None
     processing_time: Optional[float] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_now)
 
 class ChatRequest(BaseModel):
     message: str
 
 class Activity(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     type: str  # customer, sale, refund, issue, chat
     action: str  # created, updated, completed, etc
     description: str
     entity_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_now)
 
 class DashboardStats(BaseModel):
     total_customers: int
@@ -160,60 +248,220 @@ class DashboardStats(BaseModel):
     revenue_by_product: List[dict]
     recent_activities: List[Activity]
 
+# Prebuilt list validators/serializers for the list endpoints
+customer_list_adapter = TypeAdapter(List[Customer])
+sale_list_adapter = TypeAdapter(List[Sale])
+refund_list_adapter = TypeAdapter(List[Refund])
+issue_list_adapter = TypeAdapter(List[Issue])
+chat_list_adapter = TypeAdapter(List[ChatMessage])
+activity_list_adapter = TypeAdapter(List[Activity])
+
 # ==============================
 # HELPER FUNCTIONS
 # ==============================
 
-def serialize_datetime(obj):
-    """Convert datetime to ISO string for MongoDB"""
-    if isinstance(obj, dict):
-        return {k: serialize_datetime(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [serialize_datetime(item) for item in obj]
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    return obj
-
-def deserialize_datetime(obj):
-    """Convert ISO string back to datetime"""
-    if isinstance(obj, dict):
-        result = {}
-        for k, v in obj.items():
-            if k in ['created_at', 'updated_at'] and isinstance(v, str):
-                result[k] = datetime.fromisoformat(v)
+def list_response(adapter: TypeAdapter, docs: List[dict]) -> Response:
+    """Validate and encode DB rows in one pass each, bypassing response_model serialization"""
+    return Response(adapter.dump_json(adapter.validate_python(docs)), media_type="application/json")
+
+class BufferPool:
+    """Reusable fixed-size bytearrays, safe to share between worker threads"""
+    
+    def __init__(self, size: int, max_buffers: int):
+        self.size = size
+        self.max_buffers = max_buffers
+        self._free = queue.SimpleQueue()
+    
+    def acquire(self) -> bytearray:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return bytearray(self.size)
+    
+    def release(self, buf: bytearray):
+        # Beyond the cap, let the buffer be freed rather than hoarding memory
+        if self._free.qsize() < self.max_buffers:
+            self._free.put_nowait(buf)
+
+upload_buffers = BufferPool(UPLOAD_CHUNK_SIZE, UPLOAD_BUFFER_POOL_SIZE)
+
+def _spool_on_disk(src) -> bool:
+    """Whether src.fileno() is free; an in-memory spool would be forced to disk by it"""
+    if isinstance(src, tempfile.SpooledTemporaryFile):
+        # Starlette spools uploads in memory up to MultiPartParser.max_file_size bytes
+        return src.seek(0, os.SEEK_END) > MultiPartParser.max_file_size
+    return True
+
+def save_upload(src, dest: Path) -> str:
+    """Copy an upload's spooled file to disk and return its sha256; run as one worker-thread job"""
+    digest = hashlib.sha256()
+    with open(dest, "wb") as out:
+        # Uploads already on disk are copied in-kernel; anything without a real
+        # file descriptor (in-memory spools, BytesIO) is copied through a buffer
+        in_kernel = False
+        if hasattr(os, "sendfile") and _spool_on_disk(src):
+            try:
+                in_fd = src.fileno()
+            except (AttributeError, OSError):
+                pass
             else:
-                result[k] = deserialize_datetime(v)
-        return result
-    elif isinstance(obj, list):
-        return [deserialize_datetime(item) for item in obj]
-    return obj
-
-async def log_activity(type: str, action: str, description: str, entity_id: Optional[str] = None):
-    """Log an activity"""
+                out_fd, offset = out.fileno(), 0
+                while sent := os.sendfile(out_fd, in_fd, offset, UPLOAD_SENDFILE_SIZE):
+                    offset += sent
+                in_kernel = True
+        
+        # Hash from the spool (still in page cache) so the stored copy isn't re-read
+        src.seek(0)
+        if not hasattr(src, "readinto"):  # SpooledTemporaryFile before Python 3.11
+            while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                if not in_kernel:
+                    out.write(chunk)
+            return digest.hexdigest()
+        
+        buf = upload_buffers.acquire()
+        try:
+            with memoryview(buf) as view:
+                while n := src.readinto(buf):
+                    digest.update(view[:n])
+                    if not in_kernel:
+                        out.write(view[:n])
+        finally:
+            upload_buffers.release(buf)
+    return digest.hexdigest()
+
+class MongoBatcher:
+    """Coalesce concurrent inserts into one collection into insert_many calls"""
+    
+    def __init__(self, collection, max_batch: int = 100, max_delay: float = 0.01):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def close(self):
+        # Shutdown hooks still run when startup failed before start()
+        if self._task is None:
+            return
+        # Flush what is queued before the Mongo client goes away
+        if not self._task.done():
+            await self._queue.join()
+        self._task.cancel()
+        self._task = None
+    
+    def add_nowait(self, doc: dict):
+        """Queue a fire-and-forget insert; failures are logged"""
+        self._queue.put_nowait((doc, None))
+    
+    async def add(self, doc: dict):
+        """Insert a document, returning once its batch is acknowledged"""
+        # Nothing would ever resolve the future, so write directly instead
+        if not self.running:
+            await self.collection.insert_one(doc)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((doc, future))
+        await future
+    
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            errors = {}
+            try:
+                await self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+            except BulkWriteError as e:
+                errors = {err["index"]: e for err in e.details.get("writeErrors", [])}
+            except Exception as e:
+                errors = dict.fromkeys(range(len(batch)), e)
+            
+            if errors:
+                logger.error(f"Failed to write {len(errors)} of {len(batch)} docs to {self.collection.name}: {next(iter(errors.values()))}")
+            for i, (_, future) in enumerate(batch):
+                if future is not None and not future.done():
+                    if i in errors:
+                        future.set_exception(errors[i])
+                    else:
+                        future.set_result(None)
+                self._queue.task_done()
+
+# Per-collection insert batchers, started and flushed by the app lifecycle hooks
+batchers = {
+    "activities": MongoBatcher(db.activities, max_batch=ACTIVITY_BATCH_SIZE, max_delay=ACTIVITY_FLUSH_INTERVAL),
+    **{name: MongoBatcher(db[name]) for name in (
+        "documents", "social_posts", "marketing_campaigns", "video_scripts",
+        "website_checks", "seo_analyses", "web_content"
+    )}
+}
+
+def log_activity(type: str, action: str, description: str, entity_id: Optional[str] = None):
+    """Queue an activity for the batched background writer"""
     activity = Activity(
         type=type,
         action=action,
         description=description,
         entity_id=entity_id
     )
-    doc = serialize_datetime(activity.model_dump())
-    await db.activities.insert_one(doc)
+    batchers["activities"].add_nowait(activity.model_dump())
+
+async def cached_listing(collection: str, projection: dict, sort_field: str, limit: int, offset: int = 0) -> List[dict]:
+    """A newest-first page of a collection, reused from listing_cache while fresh"""
+    key = (collection, offset, limit)
+    docs = listing_cache.get(key)
+    if docs is None:
+        # id breaks timestamp ties so skip/limit pages don't overlap or drop rows
+        cursor = db[collection].find({}, projection).sort([(sort_field, -1), ("id", -1)]).skip(offset).limit(limit)
+        docs = await cursor.to_list(limit)
+        listing_cache[key] = docs
+    return docs
+
+def invalidate_listing(collection: str):
+    """Drop every cached page of a collection after a write"""
+    for key in [k for k in listing_cache if k[0] == collection]:
+        listing_cache.pop(key, None)
+
+async def completed_sales_summary(since: datetime) -> dict:
+    """Total revenue and top 10 products for completed sales since a cutoff, in one scan"""
+    # Only the $match depends on the cutoff; the $facet stage is shared and never mutated
+    pipeline = [
+        {"$match": {
+            "created_at": {"$gte": since},
+            "status": "completed"
+        }},
+        SALES_SUMMARY_FACET
+    ]
+    result = (await db.sales.aggregate(pipeline).to_list(1))[0]
+    return {
+        "total": result["total"][0]["total"] if result["total"] else 0.0,
+        "by_product": result["by_product"]
+    }
 
 # ==============================
 # ROUTES - CUSTOMERS
 # ==============================
 
 @api_router.get("/customers", response_model=List[Customer])
-async def get_customers():
-    customers = await db.customers.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(c) for c in customers]
+async def get_customers(limit: int = Query(CRM_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    docs = await db.customers.find({}, {"_id": 0}).sort(CRM_SORT).skip(offset).limit(limit).to_list(limit)
+    return list_response(customer_list_adapter, docs)
 
 @api_router.post("/customers", response_model=Customer)
 async def create_customer(input: CustomerCreate):
-    customer = Customer(**input.model_dump())
-    doc = serialize_datetime(customer.model_dump())
+    customer = Customer.model_validate(input, from_attributes=True)
+    doc = customer.model_dump()
     await db.customers.insert_one(doc)
-    await log_activity("customer", "created", f"New customer: {customer.name}", customer.id)
+    log_activity("customer", "created", f"New customer: {customer.name}", customer.id)
     return customer
 
 @api_router.get("/customers/{customer_id}", response_model=Customer)
@@ -221,7 +469,7 @@ async def get_customer(customer_id: str):
     customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return deserialize_datetime(customer)
+    return customer
 
 @api_router.put("/customers/{customer_id}", response_model=Customer)
 async def update_customer(customer_id: str, input: CustomerUpdate):
@@ -230,23 +478,23 @@ async def update_customer(customer_id: str, input: CustomerUpdate):
         raise HTTPException(status_code=404, detail="Customer not found")
     
     update_data = {k: v for k, v in input.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc)
+    update_data["updated_at"] = _now()
     
     await db.customers.update_one(
         {"id": customer_id},
-        {"$set": serialize_datetime(update_data)}
+        {"$set": update_data}
     )
     
     updated_customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
-    await log_activity("customer", "updated", f"Updated customer: {updated_customer['name']}", customer_id)
-    return deserialize_datetime(updated_customer)
+    log_activity("customer", "updated", f"Updated customer: {updated_customer['name']}", customer_id)
+    return updated_customer
 
 @api_router.delete("/customers/{customer_id}")
 async def delete_customer(customer_id: str):
     result = await db.customers.delete_one({"id": customer_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
-    await log_activity("customer", "deleted", f"Deleted customer ID: {customer_id}", customer_id)
+    log_activity("customer", "deleted", f"Deleted customer ID: {customer_id}", customer_id)
     return {"message": "Customer deleted successfully"}
 
 # ==============================
@@ -254,16 +502,16 @@ async def delete_customer(customer_id: str):
 # ==============================
 
 @api_router.get("/sales", response_model=List[Sale])
-async def get_sales():
-    sales = await db.sales.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(s) for s in sales]
+async def get_sales(limit: int = Query(CRM_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    docs = await db.sales.find({}, {"_id": 0}).sort(CRM_SORT).skip(offset).limit(limit).to_list(limit)
+    return list_response(sale_list_adapter, docs)
 
 @api_router.post("/sales", response_model=Sale)
 async def create_sale(input: SaleCreate):
-    sale = Sale(**input.model_dump())
-    doc = serialize_datetime(sale.model_dump())
+    sale = Sale.model_validate(input, from_attributes=True)
+    doc = sale.model_dump()
     await db.sales.insert_one(doc)
-    await log_activity("sale", "created", f"New sale: {sale.product} for ${sale.amount}", sale.id)
+    log_activity("sale", "created", f"New sale: {sale.product} for ${sale.amount}", sale.id)
     return sale
 
 @api_router.get("/sales/{sale_id}", response_model=Sale)
@@ -271,23 +519,23 @@ async def get_sale(sale_id: str):
     sale = await db.sales.find_one({"id": sale_id}, {"_id": 0})
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
-    return deserialize_datetime(sale)
+    return sale
 
 # ==============================
 # ROUTES - REFUNDS
 # ==============================
 
 @api_router.get("/refunds", response_model=List[Refund])
-async def get_refunds():
-    refunds = await db.refunds.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(r) for r in refunds]
+async def get_refunds(limit: int = Query(CRM_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    docs = await db.refunds.find({}, {"_id": 0}).sort(CRM_SORT).skip(offset).limit(limit).to_list(limit)
+    return list_response(refund_list_adapter, docs)
 
 @api_router.post("/refunds", response_model=Refund)
 async def create_refund(input: RefundCreate):
-    refund = Refund(**input.model_dump())
-    doc = serialize_datetime(refund.model_dump())
+    refund = Refund.model_validate(input, from_attributes=True)
+    doc = refund.model_dump()
     await db.refunds.insert_one(doc)
-    await log_activity("refund", "created", f"New refund request: ${refund.amount}", refund.id)
+    log_activity("refund", "created", f"New refund request: ${refund.amount}", refund.id)
     return refund
 
 @api_router.put("/refunds/{refund_id}", response_model=Refund)
@@ -297,32 +545,32 @@ async def update_refund(refund_id: str, input: RefundUpdate):
         raise HTTPException(status_code=404, detail="Refund not found")
     
     update_data = input.model_dump()
-    update_data["updated_at"] = datetime.now(timezone.utc)
+    update_data["updated_at"] = _now()
     
     await db.refunds.update_one(
         {"id": refund_id},
-        {"$set": serialize_datetime(update_data)}
+        {"$set": update_data}
     )
     
     updated_refund = await db.refunds.find_one({"id": refund_id}, {"_id": 0})
-    await log_activity("refund", "updated", f"Refund status changed to: {input.status}", refund_id)
-    return deserialize_datetime(updated_refund)
+    log_activity("refund", "updated", f"Refund status changed to: {input.status}", refund_id)
+    return updated_refund
 
 # ==============================
 # ROUTES - ISSUES
 # ==============================
 
 @api_router.get("/issues", response_model=List[Issue])
-async def get_issues():
-    issues = await db.issues.find({}, {"_id": 0}).to_list(1000)
-    return [deserialize_datetime(i) for i in issues]
+async def get_issues(limit: int = Query(CRM_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    docs = await db.issues.find({}, {"_id": 0}).sort(CRM_SORT).skip(offset).limit(limit).to_list(limit)
+    return list_response(issue_list_adapter, docs)
 
 @api_router.post("/issues", response_model=Issue)
 async def create_issue(input: IssueCreate):
-    issue = Issue(**input.model_dump())
-    doc = serialize_datetime(issue.model_dump())
+    issue = Issue.model_validate(input, from_attributes=True)
+    doc = issue.model_dump()
     await db.issues.insert_one(doc)
-    await log_activity("issue", "created", f"New issue: {issue.title}", issue.id)
+    log_activity("issue", "created", f"New issue: {issue.title}", issue.id)
     return issue
 
 @api_router.put("/issues/{issue_id}", response_model=Issue)
@@ -332,16 +580,16 @@ async def update_issue(issue_id: str, input: IssueUpdate):
         raise HTTPException(status_code=404, detail="Issue not found")
     
     update_data = {k: v for k, v in input.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc)
+    update_data["updated_at"] = _now()
     
     await db.issues.update_one(
         {"id": issue_id},
-        {"$set": serialize_datetime(update_data)}
+        {"$set": update_data}
     )
     
     updated_issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    await log_activity("issue", "updated", f"Issue updated: {updated_issue['title']}", issue_id)
-    return deserialize_datetime(updated_issue)
+    log_activity("issue", "updated", f"Issue updated: {updated_issue['title']}", issue_id)
+    return updated_issue
 
 # ==============================
 # ROUTES - AI AGENT CHAT
@@ -349,12 +597,6 @@ async def update_issue(issue_id: str, input: IssueUpdate):
 
 @api_router.post("/chat", response_model=ChatMessage)
 async def chat_with_agent(input: ChatRequest):
-    global ai_agent, task_coordinator
-    
-    if ai_agent is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     # Get AI response
     result = await ai_agent.solve(input.message)
     
@@ -368,16 +610,18 @@ async def chat_with_agent(input: ChatRequest):
         processing_time=result.get("processing_time")
     )
     
-    doc = serialize_datetime(chat_message.model_dump())
+    doc = chat_message.model_dump()
     await db.chat_messages.insert_one(doc)
-    await log_activity("chat", "message", f"AI Chat: {input.message[:50]}...", chat_message.id)
+    log_activity("chat", "message", f"AI Chat: {input.message[:50]}...", chat_message.id)
     
     return chat_message
 
 @api_router.get("/chat/history", response_model=List[ChatMessage])
 async def get_chat_history():
-    messages = await db.chat_messages.find({}, {"_id": 0}).sort("created_at", -1).limit(50).to_list(50)
-    return [deserialize_datetime(m) for m in messages]
+    # The planner walks the created_at index when startup built it; no hint, so a
+    # missing index falls back to an in-memory sort instead of failing the query
+    cursor = db.chat_messages.find({}, {"_id": 0}).sort("created_at", -1)
+    return list_response(chat_list_adapter, await cursor.limit(50).to_list(50))
 
 # ==============================
 # ROUTES - DOCUMENT MANAGEMENT
@@ -393,32 +637,39 @@ class DocumentAnalysis(BaseModel):
     ai_analysis: Optional[str] = None
     analysis_score: Optional[float] = None
     analysis_confidence: Optional[str] = None
-    processed_at: str
+    processed_at: datetime
 
 @api_router.post("/documents/upload")
 async def upload_document(file: UploadFile = File(...)):
     """Upload and process document"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     try:
-        # Save uploaded file
-        upload_folder = Path("/app/backend/uploads")
-        upload_folder.mkdir(exist_ok=True)
+        # Save uploaded file; the processor created its upload folder at startup
+        file_id = uuid7_hex()
+        file_path = task_coordinator.document_processor.upload_folder / f"{file_id}_{file.filename}"
         
-        file_id = str(uuid.uuid4())
-        file_path = upload_folder / f"{file_id}_{file.filename}"
+        content_hash = await asyncio.to_thread(save_upload, file.file, file_path)
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Byte-identical re-uploads reuse the stored analysis; failed ones (LLM error,
+        # no key configured) are stored but never reused, as in cached_solve
+        existing = await db.documents.find_one(
+            {"content_hash": content_hash, "analysis_confidence": {"$ne": "none"}},
+            {"_id": 0}
+        )
+        if existing:
+            await asyncio.to_thread(os.unlink, file_path)
+            log_activity("document", "uploaded", f"Document uploaded: {file.filename} (duplicate)", existing["id"])
+            return {
+                "status": "success",
+                "document_id": existing["id"],
+                "analysis": {k: v for k, v in existing.items() if k not in ("id", "file_path", "uploaded_at")},
+                "duplicate": True
+            }
         
         # Process document
         result = await task_coordinator.document_processor.process_document(
             str(file_path), 
-            file.filename
+            file.filename,
+            content_hash
         )
         
         if "error" in result:
@@ -432,11 +683,12 @@ async def upload_document(file: UploadFile = File(...)):
             "id": file_id,
             "file_path": str(file_path),
             **analysis,
-            "uploaded_at": datetime.now(timezone.utc).isoformat()
+            "uploaded_at": _now()
         }
         
-        await db.documents.insert_one(doc_record)
-        await log_activity("document", "uploaded", f"Document uploaded: {file.filename}", file_id)
+        await batchers["documents"].add(doc_record)
+        invalidate_listing("documents")
+        log_activity("document", "uploaded", f"Document uploaded: {file.filename}", file_id)
         
         return {
             "status": "success",
@@ -448,15 +700,17 @@ async def upload_document(file: UploadFile = File(...)):
         return {"status": "error", "message": str(e)}
 
 @api_router.get("/documents")
-async def get_documents():
+async def get_documents(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
     """Get all uploaded documents"""
-    docs = await db.documents.find({}, {"_id": 0, "text_content": 0}).sort("uploaded_at", -1).to_list(100)
-    return docs
+    return ORJSONResponse(await cached_listing("documents", {"_id": 0, "text_content": 0}, "uploaded_at", limit, offset))
 
 @api_router.get("/documents/{document_id}")
-async def get_document(document_id: str):
-    """Get specific document with full analysis"""
-    doc = await db.documents.find_one({"id": document_id}, {"_id": 0})
+async def get_document(document_id: str, fields: Optional[List[str]] = Query(None)):
+    """Get specific document with full analysis, or just the requested fields"""
+    projection = {"_id": 0}
+    if fields:
+        projection.update((field, 1) for field in fields if field != "_id")
+    doc = await db.documents.find_one({"id": document_id}, projection)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     return doc
@@ -470,6 +724,11 @@ class FaxRequest(BaseModel):
     document_id: str
     cover_page: Optional[str] = None
 
+class BulkFaxRequest(BaseModel):
+    to_number: str
+    document_ids: List[str]
+    cover_page: Optional[str] = None
+
 class EmailRequest(BaseModel):
     to: str
     subject: str
@@ -481,14 +740,8 @@ class EmailReplyRequest(BaseModel):
 @api_router.post("/communication/fax")
 async def send_fax(request: FaxRequest):
     """Send fax"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
-    # Get document
-    doc = await db.documents.find_one({"id": request.document_id})
+    # Get document; only the path is needed, not the extracted text or analysis
+    doc = await db.documents.find_one({"id": request.document_id}, {"_id": 0, "file_path": 1})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -498,36 +751,42 @@ async def send_fax(request: FaxRequest):
         request.cover_page
     )
     
-    await log_activity("fax", "sent", f"Fax sent to {request.to_number}")
+    log_activity("fax", "sent", f"Fax sent to {request.to_number}")
     return result
 
+@api_router.post("/communication/fax/bulk")
+async def send_fax_bulk(request: BulkFaxRequest):
+    """Send several documents to one number"""
+    # One $in round-trip for every document instead of a find_one per fax
+    cursor = db.documents.find({"id": {"$in": list(set(request.document_ids))}}, {"_id": 0, "id": 1, "file_path": 1})
+    paths = {doc["id"]: doc["file_path"] async for doc in cursor}
+    missing = [doc_id for doc_id in request.document_ids if doc_id not in paths]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Documents not found: {', '.join(missing)}")
+    
+    results = await asyncio.gather(*(
+        task_coordinator.communication.send_fax(request.to_number, paths[doc_id], request.cover_page)
+        for doc_id in request.document_ids
+    ))
+    
+    log_activity("fax", "sent", f"{len(results)} faxes sent to {request.to_number}")
+    return results
+
 @api_router.post("/communication/email")
 async def send_email(request: EmailRequest):
     """Send email"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.communication.send_email(
         request.to,
         request.subject,
         request.body
     )
     
-    await log_activity("email", "sent", f"Email sent to {request.to}")
+    log_activity("email", "sent", f"Email sent to {request.to}")
     return result
 
 @api_router.post("/communication/email/reply")
 async def generate_email_reply(request: EmailReplyRequest):
     """Generate AI email reply"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.communication.generate_email_reply(
         request.original_email,
         task_coordinator.ai_agent
@@ -542,6 +801,7 @@ async def generate_email_reply(request: EmailReplyRequest):
 class SocialPostRequest(BaseModel):
     topic: str
     platform: str  # linkedin, twitter, facebook, instagram
+    force_refresh: bool = False  # Regenerate instead of reusing a cached result
 
 class PostToSocialRequest(BaseModel):
     platform: str
@@ -549,84 +809,69 @@ class PostToSocialRequest(BaseModel):
 
 class MarketingCampaignRequest(BaseModel):
     campaign_type: str
+    force_refresh: bool = False  # Regenerate instead of reusing a cached result
 
 @api_router.post("/marketing/generate-post")
 async def generate_social_post(request: SocialPostRequest):
     """Generate social media post"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.marketing.generate_social_post(
         request.topic,
         request.platform,
-        task_coordinator.ai_agent
+        task_coordinator.ai_agent,
+        request.force_refresh
     )
     
     # Store in database
     post_record = {
-        "id": str(uuid.uuid4()),
+        "id": uuid7_hex(),
         **result
     }
-    await db.social_posts.insert_one(post_record)
-    await log_activity("marketing", "created", f"{request.platform} post generated")
+    await batchers["social_posts"].add(post_record)
+    invalidate_listing("social_posts")
+    log_activity("marketing", "created", f"{request.platform} post generated")
     
     return result
 
 @api_router.post("/marketing/post")
 async def post_to_social(request: PostToSocialRequest):
     """Post content to social media"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.marketing.post_to_social(
         request.platform,
         request.content
     )
     
-    await log_activity("marketing", "posted", f"Posted to {request.platform}")
+    log_activity("marketing", "posted", f"Posted to {request.platform}")
     return result
 
 @api_router.post("/marketing/campaign")
 async def generate_marketing_campaign(request: MarketingCampaignRequest):
     """Generate complete marketing campaign"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.marketing.generate_marketing_campaign(
         request.campaign_type,
-        task_coordinator.ai_agent
+        task_coordinator.ai_agent,
+        request.force_refresh
     )
     
     # Store in database
     campaign_record = {
-        "id": str(uuid.uuid4()),
+        "id": uuid7_hex(),
         **result
     }
-    await db.marketing_campaigns.insert_one(campaign_record)
-    await log_activity("marketing", "campaign_created", f"Campaign created: {request.campaign_type}")
+    await batchers["marketing_campaigns"].add(campaign_record)
+    invalidate_listing("marketing_campaigns")
+    log_activity("marketing", "campaign_created", f"Campaign created: {request.campaign_type}")
     
     return result
 
 @api_router.get("/marketing/posts")
-async def get_social_posts():
+async def get_social_posts(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
     """Get all generated social posts"""
-    posts = await db.social_posts.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return posts
+    return ORJSONResponse(await cached_listing("social_posts", {"_id": 0}, "created_at", limit, offset))
 
 @api_router.get("/marketing/campaigns")
-async def get_campaigns():
+async def get_campaigns(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
     """Get all marketing campaigns"""
-    campaigns = await db.marketing_campaigns.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return campaigns
+    return ORJSONResponse(await cached_listing("marketing_campaigns", {"_id": 0}, "created_at", limit, offset))
 
 # ==============================
 # ROUTES - VIDEO & COMMERCIALS
@@ -635,6 +880,7 @@ async def get_campaigns():
 class CommercialRequest(BaseModel):
     duration: int  # seconds
     focus: str
+    force_refresh: bool = False  # Regenerate instead of reusing a cached result
 
 class VideoGenerationRequest(BaseModel):
     script: str
@@ -643,50 +889,39 @@ class VideoGenerationRequest(BaseModel):
 @api_router.post("/video/generate-script")
 async def generate_commercial_script(request: CommercialRequest):
     """Generate commercial script"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.video_gen.generate_commercial_script(
         request.duration,
         request.focus,
-        task_coordinator.ai_agent
+        task_coordinator.ai_agent,
+        request.force_refresh
     )
     
     # Store in database
     script_record = {
-        "id": str(uuid.uuid4()),
+        "id": uuid7_hex(),
         **result
     }
-    await db.video_scripts.insert_one(script_record)
-    await log_activity("video", "script_created", f"{request.duration}s commercial script generated")
+    await batchers["video_scripts"].add(script_record)
+    invalidate_listing("video_scripts")
+    log_activity("video", "script_created", f"{request.duration}s commercial script generated")
     
     return result
 
 @api_router.post("/video/generate")
 async def generate_video(request: VideoGenerationRequest):
     """Generate video from script"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.video_gen.generate_video(
         request.script,
         request.voice_type
     )
     
-    await log_activity("video", "generated", "Video generation queued")
+    log_activity("video", "generated", "Video generation queued")
     return result
 
 @api_router.get("/video/scripts")
-async def get_video_scripts():
+async def get_video_scripts(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
     """Get all video scripts"""
-    scripts = await db.video_scripts.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return scripts
+    return ORJSONResponse(await cached_listing("video_scripts", {"_id": 0}, "created_at", limit, offset))
 
 # ==============================
 # ROUTES - WEBSITE MANAGEMENT
@@ -694,77 +929,61 @@ async def get_video_scripts():
 
 class WebContentRequest(BaseModel):
     page: str
+    force_refresh: bool = False  # Regenerate instead of reusing a cached result
 
 @api_router.get("/website/status")
 async def check_website_status():
     """Check website status and performance"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.website.check_website_status()
     
     # Store in database
     status_record = {
-        "id": str(uuid.uuid4()),
+        "id": uuid7_hex(),
         **result
     }
-    await db.website_checks.insert_one(status_record)
+    await batchers["website_checks"].add(status_record)
+    invalidate_listing("website_checks")
     
     return result
 
 @api_router.get("/website/seo-analysis")
-async def analyze_website_seo():
+async def analyze_website_seo(force_refresh: bool = Query(False)):
     """Analyze website SEO"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
-    result = await task_coordinator.website.analyze_seo(task_coordinator.ai_agent)
+    result = await task_coordinator.website.analyze_seo(task_coordinator.ai_agent, force_refresh)
     
     # Store in database
     seo_record = {
-        "id": str(uuid.uuid4()),
+        "id": uuid7_hex(),
         **result
     }
-    await db.seo_analyses.insert_one(seo_record)
-    await log_activity("website", "seo_analyzed", "SEO analysis completed")
+    await batchers["seo_analyses"].add(seo_record)
+    log_activity("website", "seo_analyzed", "SEO analysis completed")
     
     return result
 
 @api_router.post("/website/generate-content")
 async def generate_website_content(request: WebContentRequest):
     """Generate website content"""
-    global task_coordinator
-    
-    if task_coordinator is None:
-        ai_agent = create_ai_agent()
-        task_coordinator = TaskCoordinator(ai_agent)
-    
     result = await task_coordinator.website.generate_website_content(
         request.page,
-        task_coordinator.ai_agent
+        task_coordinator.ai_agent,
+        request.force_refresh
     )
     
     # Store in database
     content_record = {
-        "id": str(uuid.uuid4()),
+        "id": uuid7_hex(),
         **result
     }
-    await db.web_content.insert_one(content_record)
-    await log_activity("website", "content_generated", f"Content generated for {request.page}")
+    await batchers["web_content"].add(content_record)
+    log_activity("website", "content_generated", f"Content generated for {request.page}")
     
     return result
 
 @api_router.get("/website/history")
-async def get_website_checks():
+async def get_website_checks(limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
     """Get website check history"""
-    checks = await db.website_checks.find({}, {"_id": 0}).sort("checked_at", -1).limit(50).to_list(50)
-    return checks
+    return ORJSONResponse(await cached_listing("website_checks", {"_id": 0}, "checked_at", limit, offset))
 
 # ==============================
 # ROUTES - DASHBOARD
@@ -772,60 +991,24 @@ async def get_website_checks():
 
 @api_router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats():
-    # Get date 30 days ago
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    one_month_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    
-    # Total customers
-    total_customers = await db.customers.count_documents({"status": "active"})
-    
-    # New customers this month
-    new_customers = await db.customers.count_documents({
-        "created_at": {"$gte": one_month_ago.isoformat()}
-    })
-    
-    # Pending refunds
-    pending_refunds = await db.refunds.count_documents({"status": "pending"})
-    
-    # Open issues
-    open_issues = await db.issues.count_documents({"status": {"$in": ["open", "in_progress"]}})
+    # Start of the reporting window
+    thirty_days_ago = _now() - DASHBOARD_WINDOW
+    
+    # Independent queries, issued together so their round-trips overlap
+    total_customers, new_customers, pending_refunds, open_issues, sales_summary, activities = await asyncio.gather(
+        db.customers.count_documents({"status": "active"}),
+        db.customers.count_documents({"created_at": {"$gte": thirty_days_ago}}),
+        db.refunds.count_documents({"status": "pending"}),
+        db.issues.count_documents({"status": {"$in": OPEN_ISSUE_STATUSES}}),
+        completed_sales_summary(thirty_days_ago),
+        db.activities.find({}, {"_id": 0}).sort("created_at", -1).limit(10).to_list(10)
+    )
     
     # Revenue last 30 days
-    sales_pipeline = [
-        {"$match": {
-            "created_at": {"$gte": thirty_days_ago.isoformat()},
-            "status": "completed"
-        }},
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]
-    revenue_result = await db.sales.aggregate(sales_pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total"] if revenue_result else 0.0
+    total_revenue = sales_summary["total"]
+    revenue_by_product = sales_summary["by_product"]
     
-    # Revenue by product
-    product_pipeline = [
-        {"$match": {
-            "created_at": {"$gte": thirty_days_ago.isoformat()},
-            "status": "completed"
-        }},
-        {"$group": {
-            "_id": "$product",
-            "revenue": {"$sum": "$amount"},
-            "count": {"$sum": 1}
-        }},
-        {"$sort": {"revenue": -1}},
-        {"$limit": 10}
-    ]
-    product_results = await db.sales.aggregate(product_pipeline).to_list(10)
-    revenue_by_product = [
-        {"product": r["_id"], "revenue": r["revenue"], "count": r["count"]}
-        for r in product_results
-    ]
-    
-    # Recent activities
-    activities = await db.activities.find({}, {"_id": 0}).sort("created_at", -1).limit(10).to_list(10)
-    recent_activities = [Activity(**deserialize_datetime(a)) for a in activities]
-    
-    return DashboardStats(
+    stats = DashboardStats(
         total_customers=total_customers,
         new_customers_this_month=new_customers,
         pending_refunds=pending_refunds,
@@ -834,8 +1017,10 @@ async def get_dashboard_stats():
         issues_needing_review=open_issues,
         total_revenue_30_days=total_revenue,
         revenue_by_product=revenue_by_product,
-        recent_activities=recent_activities
+        recent_activities=activity_list_adapter.validate_python(activities)
     )
+    # Already validated; encode once instead of response_model revalidating it
+    return Response(stats.model_dump_json(), media_type="application/json")
 
 # ==============================
 # HEALTH CHECK
@@ -846,12 +1031,18 @@ async def root():
     return {"message": "OfficeFlow AI API is running", "version": "1.0.0"}
 
 @api_router.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "ai_agent": "ready" if ai_agent else "not initialized"
-    }
+async def health_check(deep: bool = Query(False)):
+    # Orchestrators poll this constantly; only ?deep=1 pays for a Mongo round-trip
+    if deep:
+        try:
+            await db.command("ping")
+        except Exception as e:
+            logger.error(f"Health check ping failed: {e}")
+            return ORJSONResponse(
+                {**(_HEALTH_OK if AGENT_READY else _HEALTH_STARTING), "status": "unhealthy", "database": "unreachable"},
+                status_code=503
+            )
+    return _HEALTH_OK if AGENT_READY else _HEALTH_STARTING
 
 @api_router.get("/download/package")
 async def download_package():
@@ -877,10 +1068,11 @@ app.include_router(api_router)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+    allow_origins=CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestTimeMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -889,6 +1081,128 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Timestamp fields that were stored as ISO strings before dates went native
+ISO_DATE_FIELDS = {
+    "customers": ("created_at", "updated_at"),
+    "sales": ("created_at", "updated_at"),
+    "refunds": ("created_at", "updated_at"),
+    "issues": ("created_at", "updated_at"),
+    "chat_messages": ("created_at",),
+    "activities": ("created_at",),
+    "documents": ("uploaded_at", "processed_at"),
+    "social_posts": ("created_at",),
+    "marketing_campaigns": ("created_at",),
+    "video_scripts": ("created_at",),
+    "web_content": ("created_at",),
+    "website_checks": ("checked_at",),
+    "seo_analyses": ("analyzed_at",),
+}
+
+async def _convert_iso_dates(collection, field: str):
+    # Unparseable strings are left as they are rather than failing the whole update
+    result = await collection.update_many(
+        {field: {"$type": "string"}},
+        [{"$set": {field: {"$convert": {"input": f"${field}", "to": "date", "onError": f"${field}"}}}}]
+    )
+    if result.modified_count:
+        logger.info(f"Converted {result.modified_count} {collection.name}.{field} values to dates")
+
+@app.on_event("startup")
+async def migrate_iso_dates():
+    # One-off: range filters and sorts only see native dates, so upgraded databases
+    # would otherwise drop old rows from dashboard counts and misorder listings
+    if await db.migrations.find_one({"_id": "iso_dates"}):
+        return
+    try:
+        await asyncio.gather(*(
+            _convert_iso_dates(db[name], field)
+            for name, fields in ISO_DATE_FIELDS.items() for field in fields
+        ))
+    except Exception as e:
+        logger.error(f"ISO date migration failed, will retry on next start: {e}")
+        return
+    await db.migrations.insert_one({"_id": "iso_dates", "applied_at": _now()})
+
+async def _ensure_index(collection, keys, **kwargs):
+    try:
+        await collection.create_index(keys, **kwargs)
+    except Exception as e:
+        logger.error(f"Failed to create index {keys} on {collection.name}: {e}")
+
+@app.on_event("startup")
+async def create_indexes():
+    # Idempotent: Mongo skips indexes that already exist. Failures (Mongo down,
+    # duplicate ids blocking a unique index) are logged rather than aborting startup
+    await asyncio.gather(
+        _ensure_index(db.customers, "id", unique=True),
+        _ensure_index(db.sales, "id", unique=True),
+        _ensure_index(db.refunds, "id", unique=True),
+        _ensure_index(db.issues, "id", unique=True),
+        _ensure_index(db.chat_messages, "id", unique=True),
+        _ensure_index(db.documents, "id", unique=True),
+        _ensure_index(db.activities, [("created_at", -1)]),
+        _ensure_index(db.chat_messages, [("created_at", -1)]),
+        # Dashboard filters; sales is equality-then-range for the revenue $match
+        _ensure_index(db.customers, "status"),
+        _ensure_index(db.refunds, "status"),
+        _ensure_index(db.issues, "status"),
+        _ensure_index(db.sales, [("status", 1), ("created_at", 1)]),
+        # CRM list page order; the customers one also serves the new-customers range count
+        _ensure_index(db.customers, CRM_SORT),
+        _ensure_index(db.sales, CRM_SORT),
+        _ensure_index(db.refunds, CRM_SORT),
+        _ensure_index(db.issues, CRM_SORT),
+        # Newest-first office listings
+        _ensure_index(db.documents, [("uploaded_at", -1), ("id", -1)]),
+        _ensure_index(db.documents, "content_hash"),
+        _ensure_index(db.social_posts, [("created_at", -1), ("id", -1)]),
+        _ensure_index(db.marketing_campaigns, [("created_at", -1), ("id", -1)]),
+        _ensure_index(db.video_scripts, [("created_at", -1), ("id", -1)]),
+        _ensure_index(db.website_checks, [("checked_at", -1), ("id", -1)])
+    )
+
+@app.on_event("startup")
+async def startup_http_client():
+    # One pooled HTTP/2 client for outbound checks instead of a session per request
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(10.0),
+        follow_redirects=True
+    )
+
+@app.on_event("startup")
+async def startup_ai_agent():
+    # Warm the agent before the first request; runs after the HTTP client hook
+    global ai_agent, task_coordinator, AGENT_READY
+    ai_agent = await asyncio.to_thread(create_ai_agent)
+    task_coordinator = TaskCoordinator(ai_agent, app.state.http_client)
+    AGENT_READY = True
+
+@app.on_event("startup")
+async def startup_batchers():
+    for batcher in batchers.values():
+        batcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_batchers():
+    # Registered before shutdown_db_client so pending inserts are flushed first
+    await asyncio.gather(*(batcher.close() for batcher in batchers.values()))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await app.state.http_client.aclose()
+
+@app.on_event("shutdown")
+async def shutdown_ai_agent():
+    global AGENT_READY
+    AGENT_READY = False
+    if task_coordinator is not None:
+        task_coordinator.document_processor.close()
+    # Only the complex agent holds a pooled HTTP client
+    if ai_agent is not None and hasattr(ai_agent, "aclose"):
+        await ai_agent.aclose()
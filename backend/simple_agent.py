@@ -4,6 +4,7 @@ Simple AI Agent using Emergent Integrations
 import os
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from cachetools import TTLCache
 import asyncio
 
 load_dotenv()
@@ -13,7 +14,11 @@ class SimpleAIAgent:
     
     def __init__(self):
         self.api_key = os.getenv("EMERGENT_LLM_KEY", "")
-        self.chats = {}
+        # Chat sessions, LRU-bounded and dropped after an hour idle
+        self.chats = TTLCache(
+            maxsize=int(os.getenv("CHAT_SESSION_CACHE_SIZE", "1024")),
+            ttl=int(os.getenv("CHAT_SESSION_TTL", "3600"))
+        )
         
     async def solve(self, message: str, session_id: str = "default") -> dict:
         """Get AI response"""
@@ -27,15 +32,16 @@ class SimpleAIAgent:
             }
         
         try:
-            # Create or get chat session
-            if session_id not in self.chats:
-                self.chats[session_id] = LlmChat(
+            # Create or get chat session; no await in between, so no race on creation
+            chat = self.chats.get(session_id)
+            if chat is None:
+                chat = LlmChat(
                     api_key=self.api_key,
                     session_id=session_id,
                     system_message="You are a helpful AI assistant for NextAI Global, specializing in estate planning, publishing, software development, and IT services."
                 ).with_model("openai", "gpt-4o")
-            
-            chat = self.chats[session_id]
+            # Re-insert so the idle timer restarts on every use
+            self.chats[session_id] = chat
             
             # Send message
             user_msg = UserMessage(text=message)
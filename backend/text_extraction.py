@@ -0,0 +1,21 @@
+"""
+NextAI Global - Document Text Extraction
+Kept free of heavy imports: spawned extraction workers import only this module
+"""
+
+import PyPDF2
+import docx
+
+def extract_pdf_text(file_path: str) -> str:
+    """Extract text from PDF"""
+    # Pages share one reader and file stream, so they are extracted in order on one worker
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        texts = [page.extract_text() or "" for page in pdf_reader.pages]
+    return "\n".join(texts).strip()
+
+def extract_docx_text(file_path: str) -> str:
+    """Extract text from DOCX"""
+    doc = docx.Document(file_path)
+    text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    return text.strip()
@@ -21,7 +21,12 @@ export default function Marketing() {
   const handleGeneratePost = async () => {
     setLoading(true);
     try {
-      const response = await axios.post(`${BACKEND_URL}/api/marketing/generate-post`, postData);
+      // Generating again for the post on screen asks for a fresh one instead of the cached result
+      const regenerate = generatedPost?.topic === postData.topic && generatedPost?.platform === postData.platform;
+      const response = await axios.post(`${BACKEND_URL}/api/marketing/generate-post`, {
+        ...postData,
+        force_refresh: regenerate
+      });
       setGeneratedPost(response.data);
       toast.success('Social post generated!');
     } catch (error) {
@@ -34,7 +39,8 @@ export default function Marketing() {
     setLoading(true);
     try {
       const response = await axios.post(`${BACKEND_URL}/api/marketing/campaign`, {
-        campaign_type: campaignType
+        campaign_type: campaignType,
+        force_refresh: campaign?.campaign_type === campaignType
       });
       setCampaign(response.data);
       toast.success('Marketing campaign generated!');
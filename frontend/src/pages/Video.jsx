@@ -20,7 +20,12 @@ export default function Video() {
   const handleGenerateScript = async () => {
     setLoading(true);
     try {
-      const response = await axios.post(`${BACKEND_URL}/api/video/generate-script`, scriptData);
+      // Generating again for the script on screen asks for a fresh one instead of the cached result
+      const regenerate = script?.duration === scriptData.duration && script?.focus === scriptData.focus;
+      const response = await axios.post(`${BACKEND_URL}/api/video/generate-script`, {
+        ...scriptData,
+        force_refresh: regenerate
+      });
       setScript(response.data);
       toast.success('Commercial script generated!');
     } catch (error) {
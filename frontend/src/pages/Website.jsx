@@ -32,7 +32,9 @@ export default function Website() {
   const analyzeSEO = async () => {
     setLoading(true);
     try {
-      const response = await axios.get(`${BACKEND_URL}/api/website/seo-analysis`);
+      const response = await axios.get(`${BACKEND_URL}/api/website/seo-analysis`, {
+        params: { force_refresh: seoAnalysis !== null }
+      });
       setSeoAnalysis(response.data);
       toast.success('SEO analysis complete!');
     } catch (error) {
@@ -45,7 +47,8 @@ export default function Website() {
     setLoading(true);
     try {
       const response = await axios.post(`${BACKEND_URL}/api/website/generate-content`, {
-        page: pageName
+        page: pageName,
+        force_refresh: content?.page === pageName
       });
       setContent(response.data);
       toast.success('Website content generated!');